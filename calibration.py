@@ -0,0 +1,181 @@
+# Calibration of crop thermal parameters from observed phenology dates.
+#
+# Each observed season is a dict with the weather (a frame CropSeason accepts:
+# date, tmin, tmax, plus the hourly columns of project.fetch_hourly_temp for
+# hourly seasons), the planting_date and the observed event dates, e.g.
+#
+#   {"weather": df, "planting_date": date(2024, 3, 1),
+#    "events": {"emergence": date(2024, 3, 12), "harvest": date(2024, 6, 20)}}
+#
+# Event names are mapped to the crop stage whose end they mark (see
+# DEFAULT_EVENT_STAGES); stage names from crops_data.py can be used directly.
+#
+# For every candidate (t_base, t_upper) pair the cumulative GDD of all seasons
+# is computed in one broadcasted (candidates x seasons x days) array, with the
+# same daily_temperatures/integrate_daily_gdd/cumulative_sum kernels that
+# CropSeason uses, so hourly seasons are integrated hourly here too. Stage
+# GDD for a candidate is the mean cumulative GDD observed at the event dates,
+# and candidates are scored by the RMSE (in days) between predicted and
+# observed event dates. The best candidate becomes the calibrated crop entry.
+
+import json
+import numpy as np
+import pandas as pd
+from crops_data import crops
+from project import STAGE_NAMES, cumulative_sum, daily_temperatures, integrate_daily_gdd
+
+# Crop stage whose end each observed phenology event marks
+DEFAULT_EVENT_STAGES = {
+    "emergence": "initial",
+    "flowering": "development",
+    "harvest": "harvest",
+}
+
+# Default search offsets (°C) around the literature t_base and t_upper
+T_BASE_OFFSETS = np.arange(-4.0, 4.5, 0.5)
+T_UPPER_OFFSETS = np.arange(-4.0, 5.0, 1.0)
+
+
+# Stack the daily_temperatures of the seasons into one NaN-padded
+# (seasons x days x hours) array and find the day index of every observed
+# stage end (-1 where not observed). Hours is 24 when any season is hourly;
+# daily seasons then repeat their daily mean, which integrates the same.
+def stack_observed_seasons(observations, event_stages=None):
+    event_stages = DEFAULT_EVENT_STAGES if event_stages is None else event_stages
+    stage_names = STAGE_NAMES[:-1]
+
+    weather_list = []
+    for season in observations:
+        weather = season["weather"]
+        weather = weather[weather["date"].dt.date >= season["planting_date"]]
+        weather_list.append(weather.sort_values("date").reset_index(drop=True))
+
+    season_temperatures = [daily_temperatures(w) for w in weather_list]
+    n_days = max((len(w) for w in weather_list), default=0)
+    n_hours = max((t.shape[1] for t in season_temperatures), default=1)
+    temperatures = np.full((len(weather_list), n_days, n_hours), np.nan)
+    lengths = np.zeros(len(weather_list), dtype=int)
+    observed = np.full((len(stage_names), len(weather_list)), -1)
+
+    for s, (season, weather) in enumerate(zip(observations, weather_list)):
+        lengths[s] = len(weather)
+        temperatures[s, : len(weather)] = season_temperatures[s]
+
+        days = weather["date"].to_numpy().astype("datetime64[D]")
+        for event, event_date in season["events"].items():
+            stage = event_stages.get(event, event)
+            if stage not in stage_names:
+                raise ValueError(f"Unknown phenology event: {event}")
+            index = np.searchsorted(days, np.datetime64(event_date, "D"))
+            if index < len(days) and days[index] == np.datetime64(event_date, "D"):
+                observed[stage_names.index(stage), s] = index
+
+    return temperatures, lengths, observed
+
+
+# Cumulative GDD of every season for every candidate (t_base, t_upper) pair,
+# as one (candidates x seasons x days) array from the stacked
+# (seasons x days x hours) temperatures; padding days are NaN
+def cumulative_gdd_candidates(temperatures, t_base, t_upper):
+    t_base = np.asarray(t_base, dtype=float)[:, None, None, None]
+    t_upper = np.asarray(t_upper, dtype=float)[:, None, None, None]
+    return cumulative_sum(integrate_daily_gdd(temperatures[None], t_base, t_upper))
+
+
+# Fit t_base, t_upper and the observed stage GDD of one crop. Stages without
+# observations keep their literature values scaled like the observed ones.
+def calibrate_crop(
+    crop_id,
+    observations,
+    t_base_grid=None,
+    t_upper_grid=None,
+    event_stages=None,
+    crops_table=None,
+):
+    crops_table = crops if crops_table is None else crops_table
+    if crop_id not in crops_table:
+        raise ValueError(f"Unsupported crop_id: {crop_id}")
+    if not observations:
+        raise ValueError("At least one observed season is required.")
+
+    params = crops_table[crop_id]
+    stage_names = STAGE_NAMES[:-1]
+    if t_base_grid is None:
+        t_base_grid = params["t_base"] + T_BASE_OFFSETS
+    if t_upper_grid is None:
+        t_upper_grid = params["t_upper"] + T_UPPER_OFFSETS
+
+    base, upper = np.meshgrid(
+        np.asarray(t_base_grid, dtype=float),
+        np.asarray(t_upper_grid, dtype=float),
+        indexing="ij",
+    )
+    valid = upper > base
+    base, upper = base[valid], upper[valid]
+
+    temperatures, lengths, observed = stack_observed_seasons(observations, event_stages)
+    has_obs = observed >= 0
+    if not has_obs.any():
+        raise ValueError("No observed event falls inside the season weather.")
+
+    cumulative = cumulative_gdd_candidates(temperatures, base, upper)
+
+    # Cumulative GDD at each observed event: (candidates x stages x seasons)
+    gdd_at_event = np.take_along_axis(
+        cumulative[:, None, :, :],
+        np.maximum(observed, 0)[None, :, :, None],
+        axis=3,
+    )[..., 0]
+    gdd_at_event = np.where(has_obs[None], gdd_at_event, np.nan)
+    observed_stages = has_obs.any(axis=1)
+
+    # Least-squares stage GDD per candidate is the mean GDD at the event dates
+    stage_gdd = np.full((len(base), len(stage_names)), np.nan)
+    stage_gdd[:, observed_stages] = np.nanmean(gdd_at_event[:, observed_stages, :], axis=2)
+
+    # Predicted event day: first day the stage GDD is reached (season end if never)
+    reached = cumulative[:, None, :, :] >= stage_gdd[:, :, None, None]
+    predicted = np.where(reached.any(axis=3), reached.argmax(axis=3), lengths[None, None, :])
+    errors = np.where(has_obs[None], predicted - observed[None], 0)
+    rmse_days = np.sqrt((errors**2).sum(axis=(1, 2)) / has_obs.sum())
+
+    best = int(np.argmin(rmse_days))
+    literature = np.array([params["stages"][name] for name in stage_names], dtype=float)
+    fitted = stage_gdd[best]
+    reference = np.where(literature == 0, 1.0, literature)
+    scale = np.mean(fitted[observed_stages] / reference[observed_stages])
+    stages = np.where(observed_stages, fitted, literature * scale)
+    stages = np.maximum.accumulate(stages)
+
+    scores = pd.DataFrame({"t_base": base, "t_upper": upper, "rmse_days": rmse_days})
+    calibrated = {
+        "t_base": float(base[best]),
+        "t_upper": float(upper[best]),
+        "stages": {name: round(float(value), 1) for name, value in zip(stage_names, stages)},
+    }
+    return {
+        "params": calibrated,
+        "rmse_days": float(rmse_days[best]),
+        "scores": scores.sort_values("rmse_days").reset_index(drop=True),
+    }
+
+
+# Build a crops table with calibrated entries; calibrated maps crop_id to the
+# params returned by calibrate_crop and replaces (or adds) those entries
+def build_calibrated_crops_table(calibrated, crops_table=None):
+    crops_table = crops if crops_table is None else crops_table
+    table = {crop_id: params for crop_id, params in crops_table.items()}
+    table.update(calibrated)
+    return table
+
+
+# Save a crops table as JSON
+def save_crops_table(crops_table, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(crops_table, f, indent=2)
+
+
+# Load a crops table saved with save_crops_table (usable as CropSeason crops_table)
+def load_crops_table(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
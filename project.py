@@ -1,13 +1,79 @@
+import collections
 import datetime as dt
+import json
 import os
+import struct
 import requests
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from crops_data import crops 
+from weather_store import WeatherStore
 
-# Fetch daily temperature data using Open-Meteo API
-def fetch_daily_temp(latitude, longitude, start_date, end_date):
+# Grid resolution (degrees) used to snap coordinates before fetching weather;
+# fields closer together than this share one Open-Meteo grid cell
+GRID_RESOLUTION = 0.1
+
+# Downloaded weather series keyed by ((cell, fill_method), first_day, last_day),
+# where first_day/last_day are the dates actually returned; least recently
+# used entries are evicted beyond WEATHER_CACHE_MAX_ENTRIES
+_weather_cache = collections.OrderedDict()
+WEATHER_CACHE_MAX_ENTRIES = 512
+
+# Number of days of hourly data requested and aggregated per chunk
+HOURLY_CHUNK_DAYS = 366
+
+# Columns holding the 24 hourly temperatures of a day in hourly weather frames
+HOURLY_COLUMNS = [f"temp_h{hour:02d}" for hour in range(24)]
+
+# Storage type of HOURLY_COLUMNS; float32 is exact to well below the 0.1 °C
+# resolution of the archive and halves the hourly footprint
+HOURLY_DTYPE = np.float32
+
+# Local regional weather store read before the API (None when not in use)
+_weather_store = None
+
+# Gap repair strategies accepted by clean_daily_temp (None only flags gaps)
+FILL_METHODS = ("interpolate", "ffill", None)
+
+# Bit flags of the quality_flag column set by clean_daily_temp
+QUALITY_TMIN_FILLED = 1
+QUALITY_TMAX_FILLED = 2
+QUALITY_SWAPPED = 4
+QUALITY_MISSING_DATE = 8
+
+# Ways a scenario delta is applied to tmin/tmax: added (°C) or multiplied
+SCENARIO_MODES = ("offset", "scale")
+
+# Magic bytes identifying a CropSeason binary snapshot (format version 1)
+SNAPSHOT_MAGIC = b"GDDSNAP1"
+
+# Columns stored in a snapshot after the date offsets, in file order
+# (followed by HOURLY_COLUMNS for seasons built from hourly data and by
+# quality_flag when the weather carries one)
+SNAPSHOT_COLUMNS = [
+    "tmin",
+    "tmax",
+    "daily_gdd",
+    "cumulative_gdd",
+    "heat_stress_dd",
+    "frost_day",
+    "chill_units",
+]
+
+# Memory-map modes accepted by CropSeason.load_snapshot: read-only views on
+# the file, or copy-on-write views whose edits never reach the file
+SNAPSHOT_MODES = ("r", "c")
+
+# Minimum temperature (°C) at or below which a day counts as a frost day
+FROST_THRESHOLD = 0.0
+
+# Mean temperature range (°C) in which a day contributes one chill unit
+CHILL_RANGE = (0.0, 7.2)
+
+# Request daily temperature data from the Open-Meteo API (one HTTP call)
+def _request_daily_temp(latitude, longitude, start_date, end_date, fill_method="interpolate"):
     url = "https://archive-api.open-meteo.com/v1/archive"
     params = {
         "latitude": latitude,
@@ -30,13 +96,343 @@ def fetch_daily_temp(latitude, longitude, start_date, end_date):
     if not (len(dates) == len(tmins) == len(tmaxs)):
         raise ValueError("Open-Meteo response arrays have different lengths.")
 
-    df = pd.DataFrame({
-        "date": pd.to_datetime(dates),
-        "tmin": [float(t) for t in tmins],
-        "tmax": [float(t) for t in tmaxs],
+    return clean_daily_temp(dates, tmins, tmaxs, fill_method)
+
+# Parse and clean daily tmin/tmax arrays with array operations. Nulls become
+# NaN, the series is reindexed to a complete daily calendar, interior gaps are
+# repaired ("interpolate", "ffill", or None to leave NaN), leading/trailing
+# gaps are dropped and swapped tmin/tmax pairs are corrected. Each repair is
+# recorded in the quality_flag bitmask column.
+def clean_daily_temp(dates, tmins, tmaxs, fill_method="interpolate"):
+    if fill_method not in FILL_METHODS:
+        raise ValueError(f"Unsupported fill_method: {fill_method}")
+
+    days = pd.to_datetime(list(dates)).to_numpy().astype("datetime64[D]")
+    tmin_raw = np.array(tmins, dtype=float)
+    tmax_raw = np.array(tmaxs, dtype=float)
+
+    if len(days) == 0:
+        return pd.DataFrame({
+            "date": pd.to_datetime([]),
+            "tmin": np.empty(0),
+            "tmax": np.empty(0),
+            "quality_flag": np.empty(0, dtype=int),
+        })
+
+    # Reindex to a complete daily calendar between the first and last date
+    first_day = days.min()
+    n_days = int((days.max() - first_day).astype(int)) + 1
+    position = (days - first_day).astype(int)
+    tmin = np.full(n_days, np.nan)
+    tmax = np.full(n_days, np.nan)
+    tmin[position] = tmin_raw
+    tmax[position] = tmax_raw
+    flags = np.full(n_days, QUALITY_MISSING_DATE)
+    flags[position] = 0
+
+    # Drop leading and trailing days without both temperatures (e.g. the
+    # most recent days that the archive has not published yet)
+    valid = ~np.isnan(tmin) & ~np.isnan(tmax)
+    if not valid.any():
+        return clean_daily_temp([], [], [], fill_method)
+    first = int(np.argmax(valid))
+    last = n_days - int(np.argmax(valid[::-1]))
+    tmin, tmax, flags = tmin[first:last], tmax[first:last], flags[first:last]
+    calendar = first_day + np.arange(first, last).astype("timedelta64[D]")
+
+    flags |= np.where(np.isnan(tmin), QUALITY_TMIN_FILLED, 0)
+    flags |= np.where(np.isnan(tmax), QUALITY_TMAX_FILLED, 0)
+    if fill_method is not None:
+        tmin = _fill_gaps(tmin, fill_method)
+        tmax = _fill_gaps(tmax, fill_method)
+
+    swapped = tmin > tmax
+    flags |= np.where(swapped, QUALITY_SWAPPED, 0)
+    tmin, tmax = np.where(swapped, tmax, tmin), np.where(swapped, tmin, tmax)
+
+    return pd.DataFrame({
+        "date": pd.to_datetime(calendar),
+        "tmin": tmin,
+        "tmax": tmax,
+        "quality_flag": flags,
+    })
+
+# Fill interior NaN values of an array by linear interpolation or carry-forward
+def _fill_gaps(values, fill_method):
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+
+    index = np.arange(len(values))
+    if fill_method == "interpolate":
+        filled = values.copy()
+        filled[missing] = np.interp(index[missing], index[~missing], values[~missing])
+        return filled
+
+    last_valid = np.maximum.accumulate(np.where(missing, 0, index))
+    return values[last_valid]
+
+# Summarize the data quality of a cleaned weather frame
+def summarize_weather_quality(weather):
+    flags = weather["quality_flag"].to_numpy()
+    return {
+        "days": len(flags),
+        "missing_dates": int(np.count_nonzero(flags & QUALITY_MISSING_DATE)),
+        "filled_tmin": int(np.count_nonzero(flags & QUALITY_TMIN_FILLED)),
+        "filled_tmax": int(np.count_nonzero(flags & QUALITY_TMAX_FILLED)),
+        "swapped": int(np.count_nonzero(flags & QUALITY_SWAPPED)),
+        "unfilled": int(np.count_nonzero(weather[["tmin", "tmax"]].isna().any(axis=1))),
+    }
+
+# Snap coordinates to the centre of the provider grid cell that contains them
+def snap_to_grid(latitude, longitude, resolution=GRID_RESOLUTION):
+    lat = round(round(latitude / resolution) * resolution, 6)
+    lon = round(round(longitude / resolution) * resolution, 6)
+    return lat, lon
+
+# Merge overlapping or adjacent (start, end) date ranges
+def merge_date_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + dt.timedelta(days=1):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+# Remove all downloaded series from the in-process weather cache
+def clear_weather_cache():
+    _weather_cache.clear()
+
+# Slice the days between start and end (inclusive) out of a weather frame
+def _slice_daily_temp(df, start, end):
+    days = df["date"].dt.date
+    return df[(days >= start) & (days <= end)].reset_index(drop=True)
+
+# Look up a date range in the weather cache for a (grid cell, fill method) key
+def _cached_daily_temp(key, start, end):
+    for entry, df in _weather_cache.items():
+        entry_key, first_day, last_day = entry
+        if entry_key == key and first_day <= start and end <= last_day:
+            _weather_cache.move_to_end(entry)
+            return _slice_daily_temp(df, start, end)
+    return None
+
+# Cache a series under the dates it actually covers, so days the archive has
+# not published yet are fetched again on a later request
+def _cache_daily_temp(key, df):
+    if df.empty:
+        return
+    entry = (key, df["date"].iloc[0].date(), df["date"].iloc[-1].date())
+    _weather_cache[entry] = df
+    _weather_cache.move_to_end(entry)
+    while len(_weather_cache) > WEATHER_CACHE_MAX_ENTRIES:
+        _weather_cache.popitem(last=False)
+
+# Fetch daily temperature for many (latitude, longitude, start_date, end_date)
+# requests. Coordinates are snapped to the provider grid and overlapping date
+# ranges of the same cell are downloaded once, then sliced for each caller.
+def fetch_daily_temp_batch(requests_list, resolution=GRID_RESOLUTION, fill_method="interpolate"):
+    results = []
+    pending = []
+    fetched = {}
+    missing = {}
+    for latitude, longitude, start_date, end_date in requests_list:
+        key = (snap_to_grid(latitude, longitude, resolution), fill_method)
+        start = dt.date.fromisoformat(str(start_date))
+        end = dt.date.fromisoformat(str(end_date))
+
+        cached = _cached_daily_temp(key, start, end)
+        results.append(None if cached is None else cached.copy())
+        if cached is not None:
+            continue
+        pending.append((len(results) - 1, key, start, end))
+
+        # Serve the range from the local store when it holds every day filled
+        # with the requested method
+        if _weather_store is not None:
+            stored = _weather_store.read_range(key[0], start, end, fill_method)
+            if len(stored) == (end - start).days + 1:
+                fetched.setdefault(key, []).append((start, end, stored))
+                _cache_daily_temp(key, stored)
+                continue
+
+        missing.setdefault(key, []).append((start, end))
+
+    for key, ranges in missing.items():
+        (lat, lon), _ = key
+        for start, end in merge_date_ranges(ranges):
+            df = _request_daily_temp(lat, lon, start.isoformat(), end.isoformat(), fill_method)
+            fetched.setdefault(key, []).append((start, end, df))
+            _cache_daily_temp(key, df)
+
+    for i, key, start, end in pending:
+        for fetched_start, fetched_end, df in fetched[key]:
+            if fetched_start <= start and end <= fetched_end:
+                results[i] = _slice_daily_temp(df, start, end)
+                break
+
+    return results
+
+# Read weather from a local store (a WeatherStore or a path to one) before
+# calling the API; pass None to stop using a store
+def use_weather_store(store):
+    global _weather_store
+    if store is not None and not isinstance(store, WeatherStore):
+        store = WeatherStore(store)
+    _weather_store = store
+    clear_weather_cache()
+    return store
+
+# Seed a store from the API for many (latitude, longitude) locations; nearby
+# locations share one grid cell and one download
+def seed_weather_store(
+    store,
+    locations,
+    start_date,
+    end_date,
+    resolution=GRID_RESOLUTION,
+    fill_method="interpolate",
+):
+    cells = sorted({snap_to_grid(lat, lon, resolution) for lat, lon in locations})
+    weather = fetch_daily_temp_batch(
+        [(lat, lon, start_date, end_date) for lat, lon in cells], resolution, fill_method
+    )
+    store.write_many(dict(zip(cells, weather)), fill_method)
+
+# Seed a store from a station CSV file with date, tmin and tmax columns
+def seed_weather_store_from_station(
+    store,
+    path,
+    latitude,
+    longitude,
+    fill_method="interpolate",
+    resolution=GRID_RESOLUTION,
+):
+    station = pd.read_csv(path)
+    weather = clean_daily_temp(
+        station["date"].tolist(),
+        station["tmin"].to_numpy(dtype=float),
+        station["tmax"].to_numpy(dtype=float),
+        fill_method,
+    )
+    store.write(snap_to_grid(latitude, longitude, resolution), weather, fill_method)
+
+# Fetch daily temperature data using Open-Meteo API
+def fetch_daily_temp(latitude, longitude, start_date, end_date, fill_method="interpolate"):
+    return fetch_daily_temp_batch(
+        [(latitude, longitude, start_date, end_date)], fill_method=fill_method
+    )[0]
+
+# Request hourly temperature data from the Open-Meteo API (one HTTP call)
+def _request_hourly_temp(latitude, longitude, start_date, end_date):
+    url = "https://archive-api.open-meteo.com/v1/archive"
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_date": start_date,
+        "end_date": end_date,
+        "hourly": "temperature_2m",
+        "timezone": "auto",
+    }
+
+    response = requests.get(url, params=params, timeout=60)
+    response.raise_for_status()
+    data = response.json()
+
+    hourly = data.get("hourly", {})
+    times = hourly.get("time", [])
+    temps = hourly.get("temperature_2m", [])
+
+    if len(times) != len(temps):
+        raise ValueError("Open-Meteo response arrays have different lengths.")
+    if len(times) % 24 != 0:
+        raise ValueError("Open-Meteo hourly response does not cover whole days.")
+
+    return times, np.array(temps, dtype=float)
+
+# Stream hourly temperature in chunks of chunk_days, reducing each chunk to
+# a compact daily frame (see aggregate_hourly_temp) before it is yielded, so
+# the raw float64 hourly values of only one chunk are held at a time
+def iter_hourly_temp_chunks(
+    latitude,
+    longitude,
+    start_date,
+    end_date,
+    chunk_days=HOURLY_CHUNK_DAYS,
+):
+    latitude, longitude = snap_to_grid(latitude, longitude)
+    start = dt.date.fromisoformat(str(start_date))
+    end = dt.date.fromisoformat(str(end_date))
+
+    while start <= end:
+        chunk_end = min(end, start + dt.timedelta(days=chunk_days - 1))
+        times, temps = _request_hourly_temp(
+            latitude, longitude, start.isoformat(), chunk_end.isoformat()
+        )
+        days = np.array([t[:10] for t in times[::24]], dtype="datetime64[D]")
+        yield aggregate_hourly_temp(days, temps.reshape(-1, 24))
+        start = chunk_end + dt.timedelta(days=1)
+
+# Reduce a (days x 24) hourly temperature array to a daily frame with tmin,
+# tmax and the hourly temperatures as HOURLY_DTYPE HOURLY_COLUMNS, so GDD can
+# be integrated hourly for any thresholds later. Each day takes 120 bytes
+# (date, tmin, tmax and 24 float32 values) instead of 216 for float64 hourly
+# values. Days without any hourly value are dropped.
+def aggregate_hourly_temp(days, hourly):
+    hourly = np.asarray(hourly, dtype=float)
+    has_data = ~np.isnan(hourly).all(axis=1)
+    days, hourly = days[has_data], hourly[has_data]
+
+    daily = pd.DataFrame({
+        "date": pd.to_datetime(days),
+        "tmin": np.nanmin(hourly, axis=1) if len(hourly) else np.empty(0),
+        "tmax": np.nanmax(hourly, axis=1) if len(hourly) else np.empty(0),
     })
+    hourly_df = pd.DataFrame(hourly.astype(HOURLY_DTYPE), columns=HOURLY_COLUMNS)
+    return pd.concat([daily, hourly_df], axis=1)
 
-    return df
+# Fetch hourly temperature in chunks and reduce it to a daily frame (one row
+# per day, hourly temperatures kept as compact columns). Memory is bounded by
+# 120 bytes per day of the result, about 2 MB per cell for 1979-2025, plus one
+# raw chunk of chunk_days x 192 bytes while it is being reduced.
+def fetch_hourly_temp(
+    latitude,
+    longitude,
+    start_date,
+    end_date,
+    chunk_days=HOURLY_CHUNK_DAYS,
+):
+    frames = list(
+        iter_hourly_temp_chunks(latitude, longitude, start_date, end_date, chunk_days)
+    )
+    if not frames:
+        no_days = np.empty(0, dtype="datetime64[D]")
+        return aggregate_hourly_temp(no_days, np.empty((0, 24)))
+    return pd.concat(frames, ignore_index=True)
+
+# Temperatures each day's GDD is integrated over: the (days x 24) hourly
+# columns when the weather came from the hourly path, else the (days x 1)
+# daily mean of tmin and tmax
+def daily_temperatures(weather):
+    if all(col in weather.columns for col in HOURLY_COLUMNS):
+        return weather[HOURLY_COLUMNS].to_numpy(dtype=float)
+    tmin = weather["tmin"].to_numpy(dtype=float)
+    tmax = weather["tmax"].to_numpy(dtype=float)
+    return ((tmin + tmax) / 2.0)[:, None]
+
+# Integrate daily GDD over the last axis of daily_temperatures (mean of the
+# clipped degree values over the hours with data, NaN for days without any);
+# thresholds may be arrays that broadcast against it
+def integrate_daily_gdd(temperatures, t_base, t_upper):
+    degrees = np.clip(temperatures, t_base, t_upper) - t_base
+    if degrees.shape[-1] == 1:
+        return degrees[..., 0]
+
+    has_data = ~np.isnan(degrees)
+    total = np.where(has_data, degrees, 0.0).sum(axis=-1)
+    with np.errstate(invalid="ignore"):
+        return total / has_data.sum(axis=-1)
 
 # Compute the daily growing degree days (GDD)
 def compute_daily_gdd(tmin, tmax, t_base, t_upper):
@@ -48,6 +444,31 @@ def compute_daily_gdd(tmin, tmax, t_base, t_upper):
         return t_upper - t_base
     return t_avg - t_base
 
+# Compute GDD, heat stress, frost days and chill units in one vectorized pass.
+# GDD is integrated over temperatures (see daily_temperatures) when given,
+# else over the daily mean of tmin and tmax.
+def compute_thermal_indicators(tmin, tmax, t_base, t_upper, temperatures=None):
+    tmin = np.asarray(tmin, dtype=float)
+    tmax = np.asarray(tmax, dtype=float)
+    t_avg = (tmin + tmax) / 2.0
+
+    # Same piecewise rule as compute_daily_gdd: zero below t_base, capped at t_upper
+    if temperatures is None:
+        daily_gdd = np.clip(t_avg, t_base, t_upper) - t_base
+    else:
+        daily_gdd = integrate_daily_gdd(temperatures, t_base, t_upper)
+    # Degree days of the daily maximum above the upper threshold
+    heat_stress_dd = np.maximum(tmax - t_upper, 0.0)
+    frost_day = (tmin <= FROST_THRESHOLD).astype(float)
+    chill_units = ((t_avg >= CHILL_RANGE[0]) & (t_avg <= CHILL_RANGE[1])).astype(float)
+
+    return {
+        "daily_gdd": daily_gdd,
+        "heat_stress_dd": heat_stress_dd,
+        "frost_day": frost_day,
+        "chill_units": chill_units,
+    }
+
 # Determine the Growing Stage of the CropSeason based on the current CGDD
 def determine_growing_stage(cumulative_gdd, stages_cumulative):
     initial = stages_cumulative["initial"]
@@ -79,6 +500,124 @@ def determine_growing_stage(cumulative_gdd, stages_cumulative):
     progress = max(0.0, min(1.0, progress))
     return stage, progress
 
+# Growing stages in phenological order (post_harvest follows the last threshold)
+STAGE_NAMES = ["initial", "development", "mid_season", "harvest", "post_harvest"]
+
+# Vectorized determine_growing_stage over an array of cumulative GDD values.
+# Stage thresholds may be scalars or arrays that broadcast against
+# cumulative_gdd (e.g. one threshold per crop), so many crops can be
+# classified in a single matrix operation. A NaN cumulative GDD follows the
+# scalar function (no threshold comparison holds): post_harvest, progress 1.0.
+def classify_growing_stages(cumulative_gdd, stages_cumulative):
+    cumulative_gdd = np.asarray(cumulative_gdd, dtype=float)
+    bounds = np.stack(
+        np.broadcast_arrays(
+            *[np.asarray(stages_cumulative[name], dtype=float) for name in STAGE_NAMES[:-1]]
+        ),
+        axis=-1,
+    )
+
+    # Number of thresholds below cumulative_gdd (4 means post_harvest)
+    stage_index = np.sum(cumulative_gdd[..., None] > bounds, axis=-1)
+    stage_index = np.where(np.isnan(cumulative_gdd), len(STAGE_NAMES) - 1, stage_index)
+    starts = np.concatenate((np.zeros_like(bounds[..., :1]), bounds), axis=-1)
+    ends = np.concatenate((bounds, bounds[..., -1:]), axis=-1)
+    shape = stage_index.shape + (len(STAGE_NAMES),)
+    stage_start = np.take_along_axis(np.broadcast_to(starts, shape), stage_index[..., None], axis=-1)[..., 0]
+    stage_end = np.take_along_axis(np.broadcast_to(ends, shape), stage_index[..., None], axis=-1)[..., 0]
+
+    span = stage_end - stage_start
+    progress = np.ones(stage_index.shape)
+    np.divide(cumulative_gdd - stage_start, span, out=progress, where=span != 0)
+    progress = np.clip(progress, 0.0, 1.0)
+
+    stages = np.array(STAGE_NAMES, dtype=object)[stage_index]
+    return stages, progress
+
+# Compute the overall season progress (0 to 1) from cumulative GDD; harvest_gdd
+# may be an array that broadcasts against cumulative_gdd. NaN cumulative GDD
+# gives 1.0, like max(0.0, min(1.0, nan)) in summary_today.
+def compute_overall_progress(cumulative_gdd, harvest_gdd):
+    cumulative_gdd, harvest_gdd = np.broadcast_arrays(
+        np.asarray(cumulative_gdd, dtype=float), np.asarray(harvest_gdd, dtype=float)
+    )
+    overall = np.ones(cumulative_gdd.shape)
+    np.divide(cumulative_gdd, harvest_gdd, out=overall, where=harvest_gdd != 0)
+    return np.where(np.isnan(overall), 1.0, np.clip(overall, 0.0, 1.0))
+
+# Cumulative sum along the last axis with pandas cumsum semantics: a NaN day
+# stays NaN but does not poison the days after it
+def cumulative_sum(daily):
+    daily = np.asarray(daily, dtype=float)
+    cumulative = np.cumsum(np.nan_to_num(daily, nan=0.0), axis=-1)
+    cumulative[np.isnan(daily)] = np.nan
+    return cumulative
+
+# Compute cumulative GDD of many crops over one weather series. Crops are
+# grouped by unique (t_base, t_upper) pairs so each pair is computed once as
+# one row of a (pairs x days) matrix and shared by the crops that use it.
+def compute_multi_crop_gdd(weather_series, crop_ids=None, crops_table=None):
+    crops_table = crops if crops_table is None else crops_table
+    crop_ids = list(crops_table) if crop_ids is None else list(crop_ids)
+
+    for crop_id in crop_ids:
+        if crop_id not in crops_table:
+            raise ValueError(f"Unsupported crop_id: {crop_id}")
+
+    pairs = sorted({(crops_table[c]["t_base"], crops_table[c]["t_upper"]) for c in crop_ids})
+    t_base = np.array([pair[0] for pair in pairs], dtype=float)[:, None]
+    t_upper = np.array([pair[1] for pair in pairs], dtype=float)[:, None]
+
+    temperatures = daily_temperatures(weather_series)
+    cumulative = cumulative_sum(
+        integrate_daily_gdd(temperatures[None], t_base[..., None], t_upper[..., None])
+    )
+
+    row_of_pair = {pair: row for row, pair in enumerate(pairs)}
+    rows = [row_of_pair[(crops_table[c]["t_base"], crops_table[c]["t_upper"])] for c in crop_ids]
+
+    return pd.DataFrame(
+        cumulative[rows].T,
+        index=pd.DatetimeIndex(weather_series["date"]),
+        columns=crop_ids,
+    )
+
+# Compare how every crop would progress at a field with the same weather
+def compare_crops(weather_series, planting_date, crop_ids=None, crops_table=None):
+    crops_table = crops if crops_table is None else crops_table
+    weather_df = weather_series[weather_series["date"].dt.date >= planting_date]
+    weather_df = weather_df.sort_values("date").reset_index(drop=True)
+
+    cumulative = compute_multi_crop_gdd(weather_df, crop_ids, crops_table)
+    crop_ids = list(cumulative.columns)
+    if cumulative.empty:
+        final_gdd = np.zeros(len(crop_ids))
+    else:
+        final_gdd = cumulative.iloc[-1].to_numpy()
+
+    stage_table = {
+        name: np.array([crops_table[c]["stages"][name] for c in crop_ids], dtype=float)
+        for name in STAGE_NAMES[:-1]
+    }
+    stages, stage_progress = classify_growing_stages(final_gdd, stage_table)
+    overall = compute_overall_progress(final_gdd, stage_table["harvest"])
+
+    table = pd.DataFrame(
+        {
+            "crop_id": crop_ids,
+            "t_base": [crops_table[c]["t_base"] for c in crop_ids],
+            "t_upper": [crops_table[c]["t_upper"] for c in crop_ids],
+            "cumulative_gdd": final_gdd,
+            "stage": stages,
+            "stage_progress": stage_progress,
+            "overall_progress": overall,
+        }
+    )
+    return table, cumulative
+
+# Columns of the historical dataframe (cumulative values per day since planting)
+HISTORICAL_COLUMNS = ["day", "cgdd", "year", "heat_stress_dd", "frost_days", "chill_units"]
+
 # Build a dataframe of historical temperature data for visualization (relplot)
 def build_historical_gdd_dataframe(
     latitude,
@@ -88,46 +627,61 @@ def build_historical_gdd_dataframe(
     t_base,
     t_upper,
     earliest_year=1979,
+    hourly=False,
 ):
     current_year = dt.date.today().year
     # use all past years from earliest_year up to last year
     start_year = earliest_year
     years = list(range(start_year, current_year))
 
-    records = []
+    windows = []
     for y in years:
         start = planting_date.replace(year=y)
         end = start + dt.timedelta(days=window_days - 1)
+        windows.append((latitude, longitude, start.isoformat(), end.isoformat()))
 
-        weather_hist = fetch_daily_temp(
-            latitude,
-            longitude,
-            start.isoformat(),
-            end.isoformat(),
+    if hourly:
+        # Hourly-integrated GDD, streamed in chunks for each year
+        weather_by_year = (
+            fetch_hourly_temp(lat, lon, start, end)
+            for lat, lon, start, end in windows
         )
+    else:
+        # One batched fetch; overlapping windows (seasons longer than a year)
+        # are merged into shared requests
+        weather_by_year = fetch_daily_temp_batch(windows)
 
+    records = []
+    for y, weather_hist in zip(years, weather_by_year):
         if len(weather_hist) < window_days:
             continue
 
-        daily_gdd = weather_hist.apply(
-            lambda row: compute_daily_gdd(row["tmin"], row["tmax"], t_base, t_upper),
-            axis=1,
+        # GDD is integrated hourly when the window came from the hourly path
+        indicators = compute_thermal_indicators(
+            weather_hist["tmin"].to_numpy(),
+            weather_hist["tmax"].to_numpy(),
+            t_base,
+            t_upper,
+            daily_temperatures(weather_hist),
         )
-        cumulative_gdd = daily_gdd.cumsum().tolist()
 
-        for day_index, cgdd in enumerate(cumulative_gdd, start=1):
-            records.append(
+        records.append(
+            pd.DataFrame(
                 {
-                    "day": day_index,
-                    "cgdd": cgdd,
+                    "day": np.arange(1, len(weather_hist) + 1),
+                    "cgdd": cumulative_sum(indicators["daily_gdd"]),
                     "year": y,
+                    "heat_stress_dd": cumulative_sum(indicators["heat_stress_dd"]),
+                    "frost_days": np.cumsum(indicators["frost_day"]),
+                    "chill_units": np.cumsum(indicators["chill_units"]),
                 }
             )
+        )
 
     if not records:
-        return pd.DataFrame(columns=["day", "cgdd", "year"])
+        return pd.DataFrame(columns=HISTORICAL_COLUMNS)
 
-    return pd.DataFrame.from_records(records)
+    return pd.concat(records, ignore_index=True)
 
 # Visualize cumulative GDD with ideal gdd line and historical gdd line.
 def plot_gdd_progress(season, latitude, longitude):
@@ -216,11 +770,93 @@ def plot_gdd_progress(season, latitude, longitude):
 
     print(f"Saved plot to: {filepath}")
 
+# Compute GDD, stages and harvest dates for many temperature scenarios at
+# once. Each value in deltas is added to tmin/tmax (mode="offset", in °C) or
+# multiplies them (mode="scale"); all scenarios are evaluated as one
+# (scenarios x days) array without building a DataFrame per scenario.
+def run_temperature_scenarios(weather_series, params, deltas, mode="offset"):
+    if mode not in SCENARIO_MODES:
+        raise ValueError(f"Unsupported scenario mode: {mode}")
+
+    deltas = np.atleast_1d(np.asarray(deltas, dtype=float))
+    # (scenarios x days x hours) for hourly weather, hours == 1 otherwise
+    temperatures = daily_temperatures(weather_series)[None]
+    if mode == "offset":
+        temperatures = temperatures + deltas[:, None, None]
+    else:
+        temperatures = temperatures * deltas[:, None, None]
+
+    cumulative = cumulative_sum(
+        integrate_daily_gdd(temperatures, params["t_base"], params["t_upper"])
+    )
+    if cumulative.shape[1] == 0:
+        final_gdd = np.zeros(len(deltas))
+    else:
+        final_gdd = cumulative[:, -1]
+
+    stages, stage_progress = classify_growing_stages(final_gdd, params["stages"])
+    overall = compute_overall_progress(final_gdd, params["stages"]["harvest"])
+
+    # First day on which the harvest requirement is reached (NaT if never)
+    dates = weather_series["date"].to_numpy()
+    reached = cumulative >= params["stages"]["harvest"]
+    harvest_index = np.argmax(reached, axis=1)
+    harvest_date = np.full(len(deltas), np.datetime64("NaT"), dtype=dates.dtype)
+    has_harvest = reached.any(axis=1)
+    harvest_date[has_harvest] = dates[harvest_index[has_harvest]]
+
+    table = pd.DataFrame(
+        {
+            "delta": deltas,
+            "cumulative_gdd": final_gdd,
+            "stage": stages,
+            "stage_progress": stage_progress,
+            "overall_progress": overall,
+            "harvest_date": harvest_date,
+        }
+    )
+    return table, cumulative
+
+# Overlay the cumulative GDD of several crops, each as a share of its
+# harvest requirement, in one plot
+def plot_crop_comparison(cumulative, location, crops_table=None):
+    crops_table = crops if crops_table is None else crops_table
+    output_dir = "output"
+    os.makedirs(output_dir, exist_ok=True)
+
+    if cumulative.empty:
+        print("No GDD data available to plot.")
+        return
+
+    sns.set_theme(style="whitegrid")
+    fig, ax = plt.subplots(figsize=(10, 6))
+    x_days = np.arange(1, len(cumulative) + 1)
+
+    for crop_id in cumulative.columns:
+        harvest_gdd = crops_table[crop_id]["stages"]["harvest"]
+        progress = compute_overall_progress(cumulative[crop_id].to_numpy(), harvest_gdd)
+        ax.plot(x_days, progress * 100, linewidth=1, label=crop_id)
+
+    ax.set_title(f"Crop Comparison – Progress to Harvest GDD ({location})")
+    ax.set_xlabel("Days since planting")
+    ax.set_ylabel("Overall progress (%)")
+    ax.legend(fontsize="x-small", ncol=2, loc="upper left")
+    plt.tight_layout()
+
+    safe_location = location.replace(" ", "_")
+    filename = f"{dt.date.today().isoformat()}_crop_comparison_{safe_location}.png"
+    filepath = os.path.join(output_dir, filename)
+    plt.savefig(filepath, dpi=200)
+    plt.close(fig)
+
+    print(f"Saved plot to: {filepath}")
+
 # Create CropSeason class
 class CropSeason:
     # Initialize CropSeason
-    def __init__(self, crop_id, planting_date, weather_series, location):
-        if crop_id not in crops:
+    def __init__(self, crop_id, planting_date, weather_series, location, crops_table=None):
+        crops_table = crops if crops_table is None else crops_table
+        if crop_id not in crops_table:
             raise ValueError(f"Unsupported crop_id: {crop_id}")
 
         if not isinstance(weather_series, pd.DataFrame):
@@ -228,7 +864,8 @@ class CropSeason:
 
         self.crop_id = crop_id
         self.location = location
-        self.params = crops[crop_id]
+        self._snapshot_maps = None
+        self.params = crops_table[crop_id]
         self.planting_date = planting_date
 
         weather_df = weather_series.copy()
@@ -237,37 +874,341 @@ class CropSeason:
 
         self.weather = weather_df
 
-    # Compute gdd time series (from planting date to current date)
+    # Weather frame of the season; assigning a new frame invalidates caches
+    @property
+    def weather(self):
+        return self._weather
+
+    @weather.setter
+    def weather(self, weather_df):
+        self._weather = weather_df
+        self.invalidate()
+
+    # Crop parameters of the season; assigning new params invalidates caches
+    @property
+    def params(self):
+        return self._params
+
+    @params.setter
+    def params(self, params):
+        self._params = params
+        self.invalidate()
+
+    # Mark the derived GDD series and cached results as stale. Called by the
+    # weather/params setters; call it directly after editing either in place.
+    # Seasons loaded with load_snapshot(mode="r") hold read-only weather
+    # columns: load with mode="c" or call close() before editing them in place.
+    def invalidate(self):
+        self._gdd_dirty = True
+        self._days = None
+        self._cumulative_gdd = None
+        self._stage_cache = {}
+        self._summary = None
+
+    # Recompute the GDD series only if weather or params changed since the last run
+    def _ensure_gdd_series(self):
+        if self._gdd_dirty:
+            self.compute_gdd_series()
+
+    # Dates of the weather rows as a cached datetime64[D] array
+    def _weather_days(self):
+        if self._days is None:
+            self._days = self.weather["date"].to_numpy().astype("datetime64[D]")
+        return self._days
+
+    # Build a season from hourly temperature, aggregated to daily GDD in chunks
+    @classmethod
+    def from_hourly(
+        cls,
+        crop_id,
+        planting_date,
+        latitude,
+        longitude,
+        location,
+        end_date=None,
+        chunk_days=HOURLY_CHUNK_DAYS,
+        crops_table=None,
+    ):
+        crops_table = crops if crops_table is None else crops_table
+        if crop_id not in crops_table:
+            raise ValueError(f"Unsupported crop_id: {crop_id}")
+
+        end_date = dt.date.today() if end_date is None else end_date
+        weather = fetch_hourly_temp(
+            latitude,
+            longitude,
+            planting_date.isoformat(),
+            end_date.isoformat(),
+            chunk_days,
+        )
+        return cls(crop_id, planting_date, weather, location, crops_table)
+
+    # Compute gdd time series (from planting date to current date), together
+    # with the heat stress, frost and chill indicators from the same arrays
     def compute_gdd_series(self):
         t_base = self.params["t_base"]
         t_upper = self.params["t_upper"]
 
-        self.weather["daily_gdd"] = self.weather.apply(
-            lambda row: compute_daily_gdd(row["tmin"], row["tmax"], t_base, t_upper),
-            axis=1,
+        # GDD is integrated hourly when the season was built from hourly data
+        indicators = compute_thermal_indicators(
+            self.weather["tmin"].to_numpy(),
+            self.weather["tmax"].to_numpy(),
+            t_base,
+            t_upper,
+            daily_temperatures(self.weather),
         )
-        self.weather["cumulative_gdd"] = self.weather["daily_gdd"].cumsum()
 
-    # Get current crop stage based on the given date
+        self.invalidate()
+        self.weather["daily_gdd"] = indicators["daily_gdd"]
+        self.weather["cumulative_gdd"] = cumulative_sum(indicators["daily_gdd"])
+        self.weather["heat_stress_dd"] = indicators["heat_stress_dd"]
+        self.weather["frost_day"] = indicators["frost_day"]
+        self.weather["chill_units"] = indicators["chill_units"]
+        self._cumulative_gdd = self.weather["cumulative_gdd"].to_numpy()
+        self._gdd_dirty = False
+
+    # Get season totals of the thermal indicators
+    def indicator_totals(self):
+        self._ensure_gdd_series()
+
+        return {
+            "gdd": float(self.weather["daily_gdd"].sum()),
+            "heat_stress_dd": float(self.weather["heat_stress_dd"].sum()),
+            "frost_days": int(self.weather["frost_day"].sum()),
+            "chill_units": float(self.weather["chill_units"].sum()),
+        }
+
+    # Save the season to a compact binary snapshot.
+    # Layout: magic, uint32 header length, JSON header, padding to 8 bytes,
+    # int64 day offsets from planting, then one float64 block per column.
+    def save_snapshot(self, path):
+        self._ensure_gdd_series()
+
+        # Hourly seasons keep their hourly temperatures so GDD can be
+        # recomputed from them after reload
+        columns = list(SNAPSHOT_COLUMNS)
+        if all(col in self.weather.columns for col in HOURLY_COLUMNS):
+            columns += HOURLY_COLUMNS
+        if "quality_flag" in self.weather.columns:
+            columns.append("quality_flag")
+
+        header = {
+            "crop_id": self.crop_id,
+            "location": self.location,
+            "planting_date": self.planting_date.isoformat(),
+            "params": self.params,
+            "length": len(self.weather),
+            "columns": columns,
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+        prefix_len = len(SNAPSHOT_MAGIC) + 4 + len(header_bytes)
+        padding = b"\0" * (-prefix_len % 8)
+
+        planting = np.datetime64(self.planting_date, "D")
+        offsets = (
+            self.weather["date"].to_numpy().astype("datetime64[D]") - planting
+        ).astype("<i8")
+        values = np.empty((len(columns), len(self.weather)), dtype="<f8")
+        for i, col in enumerate(columns):
+            values[i] = self.weather[col].to_numpy(dtype=float)
+
+        with open(path, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(struct.pack("<I", len(header_bytes)))
+            f.write(header_bytes)
+            f.write(padding)
+            f.write(offsets.tobytes())
+            f.write(values.tobytes())
+
+    # Load a season from a binary snapshot; the weather columns are views on a
+    # memory map of the file (no copy is made). With mode="r" the columns are
+    # read-only and in-place edits raise ValueError; with mode="c" they are
+    # copy-on-write and edits stay in memory. The file stays mapped (and locked
+    # on Windows) until close() is called or the season is discarded.
+    @classmethod
+    def load_snapshot(cls, path, mode="r"):
+        if mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unsupported snapshot mode: {mode}")
+
+        with open(path, "rb") as f:
+            magic = f.read(len(SNAPSHOT_MAGIC))
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"Not a CropSeason snapshot: {path}")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+
+        prefix_len = len(SNAPSHOT_MAGIC) + 4 + header_len
+        data_offset = prefix_len + (-prefix_len % 8)
+        length = header["length"]
+        columns = header["columns"]
+
+        if length == 0:
+            offsets = np.empty(0, dtype="<i8")
+            values = np.empty((len(columns), 0), dtype="<f8")
+        else:
+            offsets = np.memmap(
+                path, dtype="<i8", mode=mode, offset=data_offset, shape=(length,)
+            )
+            values = np.memmap(
+                path,
+                dtype="<f8",
+                mode=mode,
+                offset=data_offset + offsets.nbytes,
+                shape=(len(columns), length),
+            )
+
+        planting_date = dt.date.fromisoformat(header["planting_date"])
+        dates = np.datetime64(planting_date, "D") + offsets.astype("timedelta64[D]")
+
+        data = {"date": pd.to_datetime(dates)}
+        for i, col in enumerate(columns):
+            data[col] = values[i].astype(int) if col == "quality_flag" else values[i]
+
+        season = cls.__new__(cls)
+        season.crop_id = header["crop_id"]
+        season.location = header["location"]
+        season._snapshot_maps = values
+        season.params = header["params"]
+        season.planting_date = planting_date
+        season.weather = pd.DataFrame(data, copy=False)
+        # The snapshot already holds the derived series for these params
+        season._cumulative_gdd = season.weather["cumulative_gdd"].to_numpy()
+        season._gdd_dirty = False
+        return season
+
+    # Release the memory map of a season loaded with load_snapshot; the
+    # weather is copied into memory first, so the season stays usable and
+    # editable. Does nothing for seasons not loaded from a snapshot.
+    def close(self):
+        if self._snapshot_maps is None:
+            return
+
+        self._weather = self._weather.copy(deep=True)
+        if not self._gdd_dirty:
+            self._cumulative_gdd = self._weather["cumulative_gdd"].to_numpy()
+        self._snapshot_maps = None
+
+    # Get current crop stage based on the given date (memoized per date)
     def stage_on_date(self, target_date):
-        if "cumulative_gdd" not in self.weather.columns:
-            self.compute_gdd_series()
+        self._ensure_gdd_series()
+
+        cached = self._stage_cache.get(target_date)
+        if cached is not None:
+            return cached
+
+        row = self._row_index_on_dates([target_date])[0]
+        if row < 0:
+            result = ("pre_planting", 0.0, 0.0)
+        else:
+            cumulative_gdd = self._cumulative_gdd[row]
+            stage, progress = determine_growing_stage(
+                cumulative_gdd,
+                self.params["stages"],
+            )
+            result = (stage, progress, cumulative_gdd)
+
+        self._stage_cache[target_date] = result
+        return result
+
+    # Evaluate temperature scenarios (offsets or scale factors) for this season
+    def run_scenarios(self, deltas, mode="offset"):
+        return run_temperature_scenarios(self.weather, self.params, deltas, mode)
 
-        subset = self.weather[self.weather["date"].dt.date <= target_date]
-        if subset.empty:
-            return "pre_planting", 0.0, 0.0
+    # Find, for each target date, the index of the last weather row on or
+    # before it (-1 when the date falls before the first row)
+    def _row_index_on_dates(self, dates):
+        target_days = np.array(
+            [np.datetime64(d, "D") for d in dates], dtype="datetime64[D]"
+        )
+        return np.searchsorted(self._weather_days(), target_days, side="right") - 1
+
+    # Build a daily stage timeline (or one for the requested dates) in a
+    # single vectorized pass over the cumulative GDD series
+    def stage_timeline(self, dates=None):
+        self._ensure_gdd_series()
+
+        cumulative = self.weather["cumulative_gdd"].to_numpy(dtype=float)
+        if dates is None:
+            dates = self.weather["date"].dt.date.tolist()
+            cgdd = cumulative
+            before_planting = np.zeros(len(cgdd), dtype=bool)
+        else:
+            dates = list(dates)
+            index = self._row_index_on_dates(dates)
+            before_planting = index < 0
+            cgdd = np.zeros(len(dates))
+            cgdd[~before_planting] = cumulative[index[~before_planting]]
+
+        stages, stage_progress = classify_growing_stages(cgdd, self.params["stages"])
+        overall = compute_overall_progress(cgdd, self.params["stages"]["harvest"])
 
-        cumulative_gdd = subset.iloc[-1]["cumulative_gdd"]
-        stage, progress = determine_growing_stage(
-            cumulative_gdd,
-            self.params["stages"],
+        stages[before_planting] = "pre_planting"
+        stage_progress[before_planting] = 0.0
+        overall[before_planting] = 0.0
+
+        return pd.DataFrame(
+            {
+                "date": dates,
+                "cumulative_gdd": cgdd,
+                "stage": stages,
+                "stage_progress": stage_progress,
+                "overall_progress": overall,
+            }
         )
-        return stage, progress, cumulative_gdd
 
-    # Generate the current summary of the cropping season
+    # Yield the stage timeline one day at a time. Walks the weather rows and
+    # the dates together in a single pass, so target dates must be in
+    # ascending order (a ValueError is raised otherwise). Accepts the same
+    # date types as stage_timeline (dates, datetimes, Timestamps, strings).
+    def iter_stage_timeline(self, dates=None):
+        self._ensure_gdd_series()
+
+        weather_dates = self.weather["date"].dt.date.tolist()
+        cumulative = self.weather["cumulative_gdd"].tolist()
+        harvest_gdd = self.params["stages"]["harvest"]
+        if dates is None:
+            dates = weather_dates
+
+        row = -1
+        previous_day = None
+        for target_date in dates:
+            target_day = pd.Timestamp(target_date).date()
+            if previous_day is not None and target_day < previous_day:
+                raise ValueError("iter_stage_timeline dates must be in ascending order.")
+            previous_day = target_day
+
+            while row + 1 < len(weather_dates) and weather_dates[row + 1] <= target_day:
+                row += 1
+
+            if row < 0:
+                yield {
+                    "date": target_date,
+                    "cumulative_gdd": 0.0,
+                    "stage": "pre_planting",
+                    "stage_progress": 0.0,
+                    "overall_progress": 0.0,
+                }
+                continue
+
+            cgdd = cumulative[row]
+            stage, stage_progress = determine_growing_stage(cgdd, self.params["stages"])
+            overall = 1.0 if harvest_gdd == 0 else max(0.0, min(1.0, cgdd / harvest_gdd))
+            yield {
+                "date": target_date,
+                "cumulative_gdd": cgdd,
+                "stage": stage,
+                "stage_progress": stage_progress,
+                "overall_progress": overall,
+            }
+
+    # Generate the current summary of the cropping season (cached until the
+    # weather or params change)
     def summary_today(self):
+        if self._summary is not None:
+            return dict(self._summary)
+
         if self.weather.empty:
-            return {
+            self._summary = {
                 "crop_id": self.crop_id,
                 "date": None,
                 "cumulative_gdd": 0.0,
@@ -275,22 +1216,17 @@ class CropSeason:
                 "stage_progress": 0.0,
                 "overall_progress": 0.0,
             }
+            return dict(self._summary)
 
-        last_row = self.weather.iloc[-1]
-        last_date = last_row["date"].date()
-
-        if "cumulative_gdd" not in self.weather.columns:
-            self.compute_gdd_series()
-            last_row = self.weather.iloc[-1]
-
-        cumulative_gdd = last_row["cumulative_gdd"]
-        stage, stage_progress, _ = self.stage_on_date(last_date)
+        self._ensure_gdd_series()
+        last_date = self._weather_days()[-1].item()
+        stage, stage_progress, cumulative_gdd = self.stage_on_date(last_date)
 
         harvest_gdd = self.params["stages"]["harvest"]
         overall_progress = 1.0 if harvest_gdd == 0 else cumulative_gdd / harvest_gdd
         overall_progress = max(0.0, min(1.0, overall_progress))
 
-        return {
+        self._summary = {
             "crop_id": self.crop_id,
             "date": last_date.isoformat(),
             "cumulative_gdd": cumulative_gdd,
@@ -298,6 +1234,7 @@ class CropSeason:
             "stage_progress": stage_progress,
             "overall_progress": overall_progress,
         }
+        return dict(self._summary)
     
 # Main program execution
 def main():
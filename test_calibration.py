@@ -0,0 +1,108 @@
+import datetime as dt
+import numpy as np
+import pandas as pd
+import pytest
+from project import CropSeason, aggregate_hourly_temp
+from calibration import (
+    build_calibrated_crops_table,
+    calibrate_crop,
+    load_crops_table,
+    save_crops_table,
+)
+
+TRUE_PARAMS = {
+    "t_base": 6.0,
+    "t_upper": 28.0,
+    "stages": {"initial": 150.0, "development": 500.0, "mid_season": 900.0, "harvest": 1200.0},
+}
+
+LITERATURE_TABLE = {
+    "field_crop": {
+        "t_base": 5.0,
+        "t_upper": 30.0,
+        "stages": {"initial": 100.0, "development": 400.0, "mid_season": 800.0, "harvest": 1000.0},
+    },
+}
+
+
+# Simulate seasons in different climates and record when each true stage ends.
+def build_observations(n_seasons=12, seed=0):
+    rng = np.random.default_rng(seed)
+    observations = []
+    for s in range(n_seasons):
+        planting_date = dt.date(2000 + s, 3, 1)
+        dates = pd.date_range(planting_date, periods=250, freq="D")
+        days = np.arange(250)
+        t_mean = rng.uniform(8.0, 20.0) + 4.0 * np.sin(days / 15.0) + 0.04 * days
+        weather = pd.DataFrame({"date": dates, "tmin": t_mean - 5.0, "tmax": t_mean + 5.0})
+
+        season = CropSeason("true_crop", planting_date, weather, "Field", {"true_crop": TRUE_PARAMS})
+        season.compute_gdd_series()
+        cumulative = season.weather["cumulative_gdd"].to_numpy()
+        events = {}
+        for event, stage in (("emergence", "initial"), ("flowering", "development"), ("harvest", "harvest")):
+            index = int(np.argmax(cumulative >= TRUE_PARAMS["stages"][stage]))
+            events[event] = dates[index].date()
+        observations.append({"weather": weather, "planting_date": planting_date, "events": events})
+    return observations
+
+
+def test_calibrate_crop():
+    observations = build_observations()
+    result = calibrate_crop("field_crop", observations, crops_table=LITERATURE_TABLE)
+
+    # The fitted thresholds reproduce the observed dates closely.
+    params = result["params"]
+    assert result["rmse_days"] <= 1.0
+    assert params["t_base"] == pytest.approx(TRUE_PARAMS["t_base"], abs=1.0)
+    assert params["stages"]["harvest"] == pytest.approx(TRUE_PARAMS["stages"]["harvest"], rel=0.1)
+
+    # Stage GDD stay ordered, including the unobserved mid_season stage.
+    stages = list(params["stages"].values())
+    assert stages == sorted(stages)
+
+    # Every candidate pair is scored, best first.
+    assert result["scores"]["rmse_days"].iloc[0] == result["rmse_days"]
+
+    with pytest.raises(ValueError):
+        calibrate_crop("field_crop", [], crops_table=LITERATURE_TABLE)
+
+
+def test_calibrated_crops_table(tmp_path):
+    result = calibrate_crop("field_crop", build_observations(4), crops_table=LITERATURE_TABLE)
+
+    # The saved table round-trips and is accepted by CropSeason.
+    table = build_calibrated_crops_table({"field_crop_site": result["params"]}, LITERATURE_TABLE)
+    path = tmp_path / "crops_calibrated.json"
+    save_crops_table(table, path)
+    loaded = load_crops_table(path)
+    assert loaded == table
+
+    observation = build_observations(1)[0]
+    season = CropSeason(
+        "field_crop_site", observation["planting_date"], observation["weather"], "Field", loaded
+    )
+    assert season.summary_today()["stage"] == "post_harvest"
+
+
+def test_calibrate_hourly_season():
+    # One hourly season with a wide diurnal cycle, where the daily mean is a poor
+    # approximation of hourly GDD near the thresholds.
+    planting_date = dt.date(2001, 3, 1)
+    days = np.datetime64(planting_date) + np.arange(250)
+    hours = np.arange(24)
+    t_mean = 10.0 + 0.05 * np.arange(250)
+    hourly = t_mean[:, None] + 12.0 * np.sin((hours[None, :] - 9.0) * np.pi / 12.0)
+    weather = aggregate_hourly_temp(days, hourly)
+
+    season = CropSeason("true_crop", planting_date, weather, "Field", {"true_crop": TRUE_PARAMS})
+    season.compute_gdd_series()
+    cumulative = season.weather.set_index("date")["cumulative_gdd"]
+    harvest_date = cumulative.index[np.argmax(cumulative.to_numpy() >= 1200.0)].date()
+    observations = [{"weather": weather, "planting_date": planting_date, "events": {"harvest": harvest_date}}]
+
+    # The calibrated harvest GDD is what CropSeason integrates hourly with the calibrated thresholds.
+    result = calibrate_crop("field_crop", observations, crops_table=LITERATURE_TABLE)
+    calibrated = CropSeason("site", planting_date, weather, "Field", {"site": result["params"]})
+    _, _, harvest_gdd = calibrated.stage_on_date(harvest_date)
+    assert harvest_gdd == pytest.approx(result["params"]["stages"]["harvest"], abs=0.05)
@@ -1,7 +1,24 @@
 import pytest
+import time
 import datetime as dt
+import numpy as np
 import pandas as pd
-from project import compute_daily_gdd, determine_growing_stage, CropSeason, crops
+import project
+import calibration
+from project import (
+    compute_daily_gdd,
+    compute_thermal_indicators,
+    determine_growing_stage,
+    classify_growing_stages,
+    CropSeason,
+    crops,
+    clean_daily_temp,
+    compare_crops,
+    fetch_daily_temp_batch,
+    merge_date_ranges,
+    snap_to_grid,
+    summarize_weather_quality,
+)
 
 
 def test_compute_daily_gdd():
@@ -19,6 +36,25 @@ def test_compute_daily_gdd():
     assert result == 20.0
 
 
+def test_compute_thermal_indicators():
+    tmin = [5.0, 10.0, 40.0, -2.0]
+    tmax = [7.0, 20.0, 42.0, 6.0]
+    indicators = compute_thermal_indicators(tmin, tmax, t_base=10.0, t_upper=30.0)
+
+    # Vectorized GDD must match the scalar rule day by day.
+    expected = [compute_daily_gdd(lo, hi, 10.0, 30.0) for lo, hi in zip(tmin, tmax)]
+    assert list(indicators["daily_gdd"]) == expected
+
+    # Heat stress counts degrees of tmax above t_upper; frost and chill are day counts.
+    assert list(indicators["heat_stress_dd"]) == [0.0, 0.0, 12.0, 0.0]
+    assert list(indicators["frost_day"]) == [0.0, 0.0, 0.0, 1.0]
+    assert list(indicators["chill_units"]) == [1.0, 0.0, 0.0, 1.0]
+
+    # Given per-day temperatures, GDD is integrated over them instead.
+    temperatures = np.array([[0.0, 20.0], [10.0, 20.0], [40.0, 40.0], [5.0, 5.0]])
+    indicators = compute_thermal_indicators(tmin, tmax, 10.0, 30.0, temperatures)
+    assert list(indicators["daily_gdd"]) == [5.0, 5.0, 20.0, 0.0]
+
 
 def test_determine_growing_stage():
 
@@ -84,6 +120,12 @@ def test_cropseason_gdd():
     assert "cumulative_gdd" in season.weather.columns
     assert len(season.weather) == 5
 
+    # Indicator columns are computed in the same pass as GDD.
+    totals = season.indicator_totals()
+    assert totals["gdd"] == season.weather["cumulative_gdd"].iloc[-1]
+    assert totals["heat_stress_dd"] == 0.0
+    assert totals["frost_days"] == 0
+
 def test_cropseason_summary():
     season, tmin, tmax = build_test_season()
 
@@ -95,6 +137,363 @@ def test_cropseason_summary():
     assert 0.0 <= summary["overall_progress"] <= 1.0
 
 
+def test_cropseason_cache_invalidation():
+    season, tmin, tmax = build_test_season()
+
+    # Repeated summaries are served from the cache and are not shared objects.
+    first = season.summary_today()
+    first["stage"] = "changed"
+    assert season.summary_today()["stage"] != "changed"
+    assert season._summary is not None
+
+    # Assigning new params invalidates the derived series and the summary.
+    season.params = dict(season.params, t_base=0.0)
+    assert season._summary is None
+    assert season.summary_today()["cumulative_gdd"] > first["cumulative_gdd"]
+
+    # Assigning new weather recomputes stale GDD columns copied from another season.
+    season.weather = season.weather.assign(tmin=0.0, tmax=0.0)
+    assert season.stage_on_date(dt.date(2025, 1, 5)) == ("initial", 0.0, 0.0)
+
+    # In-place edits are picked up after an explicit invalidate().
+    season.weather["tmax"] = 20.0
+    season.invalidate()
+    assert season.summary_today()["cumulative_gdd"] == pytest.approx(50.0)
+
+
+def test_cropseason_stage_timeline():
+    season, tmin, tmax = build_test_season()
+
+    # Every row of the vectorized timeline matches stage_on_date for that day.
+    timeline = season.stage_timeline()
+    assert len(timeline) == len(season.weather)
+    for row in timeline.itertuples():
+        stage, progress, cgdd = season.stage_on_date(row.date)
+        assert row.stage == stage
+        assert row.stage_progress == pytest.approx(progress)
+        assert row.cumulative_gdd == pytest.approx(cgdd)
+
+    # Requested dates before planting are reported as pre_planting.
+    dates = [dt.date(2024, 12, 31), dt.date(2025, 1, 3), dt.date(2025, 2, 1)]
+    timeline = season.stage_timeline(dates)
+    assert list(timeline["stage"])[0] == "pre_planting"
+    assert timeline["cumulative_gdd"].iloc[-1] == season.weather["cumulative_gdd"].iloc[-1]
+
+    # The generator yields the same rows as the vectorized frame.
+    streamed = pd.DataFrame(list(season.iter_stage_timeline(dates)))
+    assert list(streamed["stage"]) == list(timeline["stage"])
+    assert list(streamed["stage_progress"]) == pytest.approx(list(timeline["stage_progress"]))
+
+    # Timestamps are accepted like in the vectorized frame.
+    stamps = [pd.Timestamp(d) for d in dates]
+    streamed = pd.DataFrame(list(season.iter_stage_timeline(stamps)))
+    assert list(streamed["stage"]) == list(season.stage_timeline(stamps)["stage"])
+
+    # Unsorted dates are rejected instead of silently reusing an earlier row.
+    with pytest.raises(ValueError):
+        list(season.iter_stage_timeline([dt.date(2025, 1, 3), dt.date(2025, 1, 1)]))
+
+
+def test_compare_crops():
+    season, tmin, tmax = build_test_season()
+    crop_ids = ["test_crop", "barley_long", "barley_short", "potato_long"]
+
+    # Every crop in the comparison table matches its own CropSeason summary.
+    weather = season.weather[["date", "tmin", "tmax"]]
+    table, cumulative = compare_crops(weather, season.planting_date, crop_ids)
+    assert list(table["crop_id"]) == crop_ids
+    assert list(cumulative.columns) == crop_ids
+    for row in table.itertuples():
+        crop_season = CropSeason(row.crop_id, season.planting_date, weather, "TestLocation")
+        summary = crop_season.summary_today()
+        assert row.stage == summary["stage"]
+        assert row.cumulative_gdd == pytest.approx(summary["cumulative_gdd"])
+        assert row.stage_progress == pytest.approx(summary["stage_progress"])
+        assert row.overall_progress == pytest.approx(summary["overall_progress"])
+
+    # Crops sharing thresholds share the same cumulative GDD curve.
+    assert list(cumulative["barley_long"]) == list(cumulative["barley_short"])
+
+    with pytest.raises(ValueError):
+        compare_crops(weather, season.planting_date, ["invalid_crop"])
+
+
+def test_cropseason_run_scenarios():
+    season, tmin, tmax = build_test_season()
+    weather = season.weather[["date", "tmin", "tmax"]]
+
+    # Each offset scenario matches a season built from shifted weather.
+    offsets = [-2.0, 0.0, 1.0, 2.0]
+    table, cumulative = season.run_scenarios(offsets)
+    assert cumulative.shape == (len(offsets), len(season.weather))
+    for row in table.itertuples():
+        shifted = weather.assign(tmin=weather["tmin"] + row.delta, tmax=weather["tmax"] + row.delta)
+        summary = CropSeason("test_crop", season.planting_date, shifted, "TestLocation").summary_today()
+        assert row.cumulative_gdd == pytest.approx(summary["cumulative_gdd"])
+        assert row.stage == summary["stage"]
+        assert row.stage_progress == pytest.approx(summary["stage_progress"])
+
+    # No scenario reaches harvest in five days; a scale of 1.0 is the baseline.
+    assert table["harvest_date"].isna().all()
+    scaled, _ = season.run_scenarios([1.0], mode="scale")
+    assert scaled["cumulative_gdd"].iloc[0] == table["cumulative_gdd"].iloc[1]
+
+    # A single scalar delta is evaluated as one scenario.
+    single, _ = season.run_scenarios(1.0)
+    assert single["cumulative_gdd"].iloc[0] == table["cumulative_gdd"].iloc[2]
+
+    with pytest.raises(ValueError):
+        season.run_scenarios([1.0], mode="percent")
+
+
+def test_cropseason_snapshot(tmp_path):
+    season, tmin, tmax = build_test_season()
+    path = tmp_path / "season.gddsnap"
+    season.save_snapshot(path)
+
+    # The reloaded season carries the same metadata and weather columns.
+    loaded = CropSeason.load_snapshot(path)
+    assert loaded.crop_id == season.crop_id
+    assert loaded.planting_date == season.planting_date
+    assert loaded.params == season.params
+    assert list(loaded.weather["date"].dt.date) == list(season.weather["date"].dt.date)
+    assert list(loaded.weather["cumulative_gdd"]) == list(season.weather["cumulative_gdd"])
+
+    # The summary is computed straight from the mapped arrays.
+    assert loaded.summary_today() == season.summary_today()
+
+    # Mapped columns are read-only until the season is closed.
+    with pytest.raises(ValueError):
+        loaded.weather.loc[0, "tmax"] = 99.0
+    loaded.close()
+    loaded.weather.loc[0, "tmax"] = 99.0
+    loaded.invalidate()
+    assert loaded.summary_today()["cumulative_gdd"] > season.summary_today()["cumulative_gdd"]
+
+    # Copy-on-write loads accept edits without changing the file.
+    season.weather["quality_flag"] = [0, 1, 0, 2, 0]
+    season.save_snapshot(path)
+    loaded = CropSeason.load_snapshot(path, mode="c")
+    assert list(loaded.weather["quality_flag"]) == [0, 1, 0, 2, 0]
+    loaded.weather.loc[0, "tmax"] = 99.0
+    assert CropSeason.load_snapshot(path).weather["tmax"].iloc[0] == season.weather["tmax"].iloc[0]
+    loaded.close()
+    with pytest.raises(ValueError):
+        CropSeason.load_snapshot(path, mode="r+")
+
+    # Files without the snapshot header are rejected.
+    bad_path = tmp_path / "bad.gddsnap"
+    bad_path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        CropSeason.load_snapshot(bad_path)
+
+
+# Fake Open-Meteo daily request: a constant 10-20 °C series, recording each
+# call; the last unpublished_days of every range are not returned yet.
+def fake_daily_request(calls, unpublished_days=0):
+    def request(latitude, longitude, start_date, end_date, fill_method="interpolate"):
+        calls.append((latitude, longitude, start_date, end_date))
+        dates = pd.date_range(start_date, end_date, freq="D")
+        dates = dates[: len(dates) - unpublished_days]
+        return pd.DataFrame({"date": dates, "tmin": 10.0, "tmax": 20.0, "quality_flag": 0})
+
+    return request
+
+
+# Fake Open-Meteo hourly request: the same 0-23 °C ramp every day, recording each call.
+def fake_hourly_request(calls):
+    def request(latitude, longitude, start_date, end_date):
+        calls.append((latitude, longitude, start_date, end_date))
+        days = pd.date_range(start_date, end_date, freq="D")
+        times = [f"{d.date().isoformat()}T{h:02d}:00" for d in days for h in range(24)]
+        return times, np.tile(np.arange(24, dtype=float), len(days))
+
+    return request
+
+
+def test_fetch_daily_temp_batch(monkeypatch):
+    calls = []
+
+    # Replace the HTTP request with a synthetic series and record each call.
+    monkeypatch.setattr(project, "_request_daily_temp", fake_daily_request(calls))
+    project.clear_weather_cache()
+
+    # Nearby fields snap to the same grid cell.
+    assert snap_to_grid(16.461, 120.587) == snap_to_grid(16.458, 120.591)
+
+    # Overlapping and adjacent ranges are merged; disjoint ranges are not.
+    d = dt.date
+    merged = merge_date_ranges(
+        [(d(2025, 1, 5), d(2025, 1, 10)), (d(2025, 1, 1), d(2025, 1, 6)),
+         (d(2025, 1, 11), d(2025, 1, 12)), (d(2025, 3, 1), d(2025, 3, 2))]
+    )
+    assert merged == [(d(2025, 1, 1), d(2025, 1, 12)), (d(2025, 3, 1), d(2025, 3, 2))]
+
+    # Two nearby fields with overlapping ranges cost one upstream request.
+    results = fetch_daily_temp_batch(
+        [(16.461, 120.587, "2025-01-01", "2025-01-10"),
+         (16.458, 120.591, "2025-01-05", "2025-01-20")]
+    )
+    assert len(calls) == 1
+    assert len(results[0]) == 10
+    assert len(results[1]) == 16
+
+    # A later request inside the downloaded range is served from the cache.
+    weather = project.fetch_daily_temp(16.46, 120.59, "2025-01-03", "2025-01-04")
+    assert len(calls) == 1
+    assert list(weather["date"].dt.day) == [3, 4]
+    project.clear_weather_cache()
+
+
+def test_fetch_daily_temp_cache_coverage(monkeypatch):
+    calls = []
+
+    # The archive has not published the last two days of the range yet.
+    monkeypatch.setattr(project, "_request_daily_temp", fake_daily_request(calls, unpublished_days=2))
+    monkeypatch.setattr(project, "WEATHER_CACHE_MAX_ENTRIES", 2)
+    project.clear_weather_cache()
+
+    # Unpublished days are requested again instead of being cached as covered.
+    assert len(project.fetch_daily_temp(16.46, 120.59, "2025-01-01", "2025-01-10")) == 8
+    project.fetch_daily_temp(16.46, 120.59, "2025-01-01", "2025-01-10")
+    assert len(calls) == 2
+
+    # Days inside the returned coverage are still served from the cache.
+    assert len(project.fetch_daily_temp(16.46, 120.59, "2025-01-02", "2025-01-08")) == 7
+    assert len(calls) == 2
+
+    # The cache keeps at most WEATHER_CACHE_MAX_ENTRIES series.
+    project.fetch_daily_temp(10.0, 10.0, "2025-01-01", "2025-01-10")
+    project.fetch_daily_temp(20.0, 20.0, "2025-01-01", "2025-01-10")
+    assert len(project._weather_cache) == 2
+    project.clear_weather_cache()
+
+
+def test_clean_daily_temp():
+    dates = ["2025-01-01", "2025-01-02", "2025-01-04", "2025-01-05", "2025-01-06"]
+    tmins = [10.0, None, 16.0, 20.0, None]
+    tmaxs = [20.0, 22.0, 26.0, 12.0, None]
+
+    # The missing date is inserted, gaps are interpolated and the trailing null day is dropped.
+    weather = clean_daily_temp(dates, tmins, tmaxs)
+    assert list(weather["date"].dt.day) == [1, 2, 3, 4, 5]
+    assert list(weather["tmin"]) == [10.0, 12.0, 14.0, 16.0, 12.0]
+    assert list(weather["tmax"]) == [20.0, 22.0, 24.0, 26.0, 20.0]
+
+    # Every repair is reported.
+    report = summarize_weather_quality(weather)
+    assert report["missing_dates"] == 1
+    assert report["filled_tmin"] == 2
+    assert report["filled_tmax"] == 1
+    assert report["swapped"] == 1
+    assert report["unfilled"] == 0
+
+    # Carry-forward repeats the last observed value; None only flags the gap.
+    weather = clean_daily_temp(dates, tmins, tmaxs, fill_method="ffill")
+    assert list(weather["tmin"])[:3] == [10.0, 10.0, 10.0]
+    weather = clean_daily_temp(dates, tmins, tmaxs, fill_method=None)
+    assert summarize_weather_quality(weather)["unfilled"] == 2
+
+    with pytest.raises(ValueError):
+        clean_daily_temp(dates, tmins, tmaxs, fill_method="median")
+
+
+def test_cropseason_from_hourly(monkeypatch):
+    build_test_season()
+    calls = []
+
+    # Hourly temperature follows the same 0-23 °C ramp every day.
+    monkeypatch.setattr(project, "_request_hourly_temp", fake_hourly_request(calls))
+
+    # Ten days are streamed in chunks of four days.
+    season = CropSeason.from_hourly(
+        "test_crop", dt.date(2025, 1, 1), 16.46, 120.59, "TestLocation",
+        end_date=dt.date(2025, 1, 10), chunk_days=4,
+    )
+    assert len(calls) == 3
+    assert len(season.weather) == 10
+    assert list(season.weather["tmin"].unique()) == [0.0]
+    assert list(season.weather["tmax"].unique()) == [23.0]
+
+    # Each chunk is reduced to compact float32 hourly columns as it is streamed.
+    assert (season.weather[project.HOURLY_COLUMNS].dtypes == np.float32).all()
+    assert season.weather.memory_usage(index=False).sum() == 10 * 120
+
+    # Hourly integration: hours below t_base (5 °C) add nothing, the rest add T - t_base.
+    expected = sum(max(h, 5.0) - 5.0 for h in range(24)) / 24
+    season.compute_gdd_series()
+    assert season.weather["daily_gdd"].iloc[0] == pytest.approx(expected)
+    assert season.weather["cumulative_gdd"].iloc[-1] == pytest.approx(10 * expected)
+
+
+def test_hourly_season_follows_params(monkeypatch, tmp_path):
+    build_test_season()
+    monkeypatch.setattr(project, "_request_hourly_temp", fake_hourly_request([]))
+    season = CropSeason.from_hourly(
+        "test_crop", dt.date(2025, 1, 1), 16.46, 120.59, "TestLocation",
+        end_date=dt.date(2025, 1, 10),
+    )
+    summary = season.summary_today()
+
+    # Changing params recomputes hourly-integrated GDD with the new thresholds.
+    season.params = dict(season.params, t_base=0.0, t_upper=10.0)
+    expected = sum(min(h, 10.0) for h in range(24)) / 24
+    assert season.summary_today()["cumulative_gdd"] == pytest.approx(10 * expected)
+    season.params = crops["test_crop"]
+    assert season.summary_today() == summary
+
+    # Scenarios, crop comparison and a reloaded snapshot use the same hourly method.
+    table, _ = season.run_scenarios(0.0)
+    assert table["cumulative_gdd"].iloc[0] == pytest.approx(summary["cumulative_gdd"])
+    comparison, _ = compare_crops(season.weather, season.planting_date, ["test_crop"])
+    assert comparison["cumulative_gdd"].iloc[0] == pytest.approx(summary["cumulative_gdd"])
+
+    path = tmp_path / "hourly.gddsnap"
+    season.save_snapshot(path)
+    loaded = CropSeason.load_snapshot(path)
+    assert loaded.summary_today() == summary
+    loaded.params = dict(loaded.params, t_base=0.0, t_upper=10.0)
+    assert loaded.summary_today()["cumulative_gdd"] == pytest.approx(10 * expected)
+
+
+def test_fetch_daily_temp_from_store(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(project, "_request_daily_temp", fake_daily_request(calls))
+    monkeypatch.setattr(project, "_weather_store", None)
+
+    # Seeding two nearby fields downloads their shared grid cell once.
+    store = project.use_weather_store(tmp_path / "region.zip")
+    project.seed_weather_store(store, [(16.461, 120.587), (16.458, 120.591)], "2024-01-01", "2024-12-31")
+    assert len(calls) == 1
+    assert store.cells() == [snap_to_grid(16.46, 120.59)]
+
+    # Ranges fully inside the store are read locally; others go to the API.
+    project.clear_weather_cache()
+    weather = project.fetch_daily_temp(16.46, 120.59, "2024-03-01", "2024-03-31")
+    assert len(weather) == 31
+    assert len(calls) == 1
+    project.fetch_daily_temp(16.46, 120.59, "2024-12-01", "2025-01-31")
+    assert len(calls) == 2
+
+    # Stored data is only served for the fill method it was stored with.
+    project.fetch_daily_temp(16.46, 120.59, "2024-03-01", "2024-03-31", fill_method=None)
+    assert len(calls) == 3
+
+    # Station files are cleaned and stored under their grid cell.
+    station_path = tmp_path / "station.csv"
+    pd.DataFrame(
+        {"date": ["2024-01-01", "2024-01-02", "2024-01-03"], "tmin": [1.0, None, 3.0], "tmax": [9.0, 10.0, 11.0]}
+    ).to_csv(station_path, index=False)
+    project.seed_weather_store_from_station(store, station_path, 40.0, -7.0)
+    stored = store.read_range(snap_to_grid(40.0, -7.0), "2024-01-01", "2024-01-03")
+    assert list(stored["tmin"]) == [1.0, 2.0, 3.0]
+    project.seed_weather_store_from_station(store, station_path, 40.0, -7.0, fill_method=None)
+    stored = store.read_range(snap_to_grid(40.0, -7.0), "2024-01-01", "2024-01-03", fill_method=None)
+    assert list(stored["tmin"]) == [1.0, 3.0]
+
+    project.use_weather_store(None)
+
+
 def test_init():
     dates = pd.date_range("2025-01-01", periods=3, freq="D")
     weather_df = pd.DataFrame(
@@ -109,4 +508,293 @@ def test_init():
 
     # Invalid weather input
     with pytest.raises(TypeError):
-        CropSeason("test_crop", planting_date, "not_a_dataframe", "TestLocation")
\ No newline at end of file
+        CropSeason("test_crop", planting_date, "not_a_dataframe", "TestLocation")
+
+
+# --- Equivalence and performance harness for the vectorized GDD kernels ---
+#
+# Each fast path is checked against the scalar reference functions on
+# randomized weather and crop tables, and timed against the scalar reference
+# in the same pass. PERF_BASELINES records the largest accepted ratio of
+# fast-path time to scalar time; a fast path fails if it is wrong or slower.
+
+PERF_BASELINES = {
+    "compute_thermal_indicators": 0.5,
+    "classify_growing_stages": 0.5,
+    "compute_gdd_series": 0.5,
+    "stage_timeline": 0.5,
+    "stage_on_date": 0.5,
+    "compute_multi_crop_gdd": 0.5,
+    "run_temperature_scenarios": 0.5,
+    "integrate_daily_gdd_hourly": 0.5,
+    "cumulative_gdd_candidates": 0.5,
+}
+
+HARNESS_SEEDS = [0, 1, 2, 3, 4]
+
+
+# Generate a random crop table; consecutive stage thresholds may be equal.
+def random_crop(rng):
+    t_base = float(rng.integers(0, 25)) / 2.0
+    t_upper = t_base + float(rng.integers(30, 60)) / 2.0
+    increments = rng.choice([0.0, 50.0, 150.0, 400.0], size=4)
+    stages = dict(zip(["initial", "development", "mid_season", "harvest"], np.cumsum(increments)))
+    return {"t_base": t_base, "t_upper": t_upper, "stages": {k: float(v) for k, v in stages.items()}}
+
+
+# Generate random weather on a 0.5 °C grid, with days where t_avg equals t_base or
+# t_upper and unrepaired missing days (NaN, as left by fill_method=None).
+def random_weather(rng, params, n_days):
+    tmin = rng.integers(-20, 60, size=n_days) / 2.0
+    tmax = tmin + rng.integers(0, 40, size=n_days) / 2.0
+    for i, threshold in ((0, params["t_base"]), (1, params["t_upper"])):
+        tmin[i], tmax[i] = threshold - 2.0, threshold + 2.0
+    tmin[rng.random(n_days) < 0.03] = np.nan
+    tmax[-1] = np.nan
+    dates = pd.date_range("2000-01-01", periods=n_days, freq="D")
+    return pd.DataFrame({"date": dates, "tmin": tmin, "tmax": tmax})
+
+
+# Time the best of a few runs of a callable.
+def best_time(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# Assert that a fast path is within its recorded ratio of the scalar reference.
+def assert_not_slower(name, fast, reference):
+    fast_time = best_time(fast)
+    reference_time = best_time(reference, repeat=1)
+    assert fast_time <= PERF_BASELINES[name] * reference_time, (
+        f"{name}: {fast_time:.6f}s vs scalar {reference_time:.6f}s"
+    )
+
+
+@pytest.mark.parametrize("seed", HARNESS_SEEDS)
+def test_harness_compute_thermal_indicators(seed):
+    rng = np.random.default_rng(seed)
+    params = random_crop(rng)
+    weather = random_weather(rng, params, 2000)
+    tmin, tmax = weather["tmin"].to_numpy(), weather["tmax"].to_numpy()
+
+    def reference():
+        return [compute_daily_gdd(lo, hi, params["t_base"], params["t_upper"]) for lo, hi in zip(tmin, tmax)]
+
+    def fast():
+        return compute_thermal_indicators(tmin, tmax, params["t_base"], params["t_upper"])["daily_gdd"]
+
+    assert list(fast()) == pytest.approx(reference(), nan_ok=True)
+    assert_not_slower("compute_thermal_indicators", fast, reference)
+
+
+@pytest.mark.parametrize("seed", HARNESS_SEEDS)
+def test_harness_classify_growing_stages(seed):
+    rng = np.random.default_rng(seed)
+    stages = random_crop(rng)["stages"]
+    # Include every threshold exactly, NaN, plus values on both sides of the range.
+    thresholds = np.array(list(stages.values()))
+    cgdd = np.concatenate((thresholds, [np.nan], rng.uniform(-10.0, thresholds[-1] + 100.0, size=2000)))
+
+    def reference():
+        return [determine_growing_stage(x, stages) for x in cgdd]
+
+    def fast():
+        return classify_growing_stages(cgdd, stages)
+
+    expected = reference()
+    labels, progress = fast()
+    assert list(labels) == [stage for stage, _ in expected]
+    assert list(progress) == pytest.approx([p for _, p in expected])
+    assert_not_slower("classify_growing_stages", fast, reference)
+
+
+@pytest.mark.parametrize("seed", HARNESS_SEEDS)
+def test_harness_compute_gdd_series(seed):
+    rng = np.random.default_rng(seed)
+    params = random_crop(rng)
+    weather = random_weather(rng, params, 2000)
+    season = CropSeason("harness_crop", dt.date(2000, 1, 1), weather, "Harness", {"harness_crop": params})
+
+    def reference():
+        daily = season.weather.apply(
+            lambda row: compute_daily_gdd(row["tmin"], row["tmax"], params["t_base"], params["t_upper"]),
+            axis=1,
+        )
+        return daily.cumsum()
+
+    expected = reference()
+    season.compute_gdd_series()
+    assert list(season.weather["cumulative_gdd"]) == pytest.approx(list(expected), nan_ok=True)
+    assert_not_slower("compute_gdd_series", season.compute_gdd_series, reference)
+
+
+@pytest.mark.parametrize("seed", HARNESS_SEEDS)
+def test_harness_stage_timeline(seed):
+    rng = np.random.default_rng(seed)
+    params = random_crop(rng)
+    weather = random_weather(rng, params, 300)
+    season = CropSeason("harness_crop", dt.date(2000, 1, 1), weather, "Harness", {"harness_crop": params})
+    season.compute_gdd_series()
+    dates = season.weather["date"].dt.date.tolist()
+
+    # Scalar reference: filter the frame for every date, then classify the last row.
+    def reference():
+        results = []
+        for d in dates:
+            cgdd = season.weather[season.weather["date"].dt.date <= d].iloc[-1]["cumulative_gdd"]
+            stage, progress = determine_growing_stage(cgdd, params["stages"])
+            results.append((stage, progress, cgdd))
+        return results
+
+    expected = reference()
+    timeline = season.stage_timeline()
+    assert list(timeline["stage"]) == [stage for stage, _, _ in expected]
+    assert list(timeline["stage_progress"]) == pytest.approx([p for _, p, _ in expected])
+    assert list(timeline["cumulative_gdd"]) == pytest.approx([c for _, _, c in expected], nan_ok=True)
+    memoized = [season.stage_on_date(d) for d in dates]
+    assert [stage for stage, _, _ in memoized] == [stage for stage, _, _ in expected]
+    assert [c for _, _, c in memoized] == pytest.approx([c for _, _, c in expected], nan_ok=True)
+    assert_not_slower("stage_timeline", season.stage_timeline, reference)
+
+    # Invalidate inside the timed call so every date goes through the lookup, not the memo.
+    def lookup():
+        season.invalidate()
+        return [season.stage_on_date(d) for d in dates]
+
+    assert_not_slower("stage_on_date", lookup, reference)
+
+
+@pytest.mark.parametrize("seed", HARNESS_SEEDS)
+def test_harness_compute_multi_crop_gdd(seed):
+    rng = np.random.default_rng(seed)
+    # Six random crops, the last sharing its thresholds with the first.
+    crops_table = {f"crop_{i}": random_crop(rng) for i in range(5)}
+    crops_table["crop_5"] = dict(random_crop(rng), t_base=crops_table["crop_0"]["t_base"],
+                                 t_upper=crops_table["crop_0"]["t_upper"])
+    weather = random_weather(rng, crops_table["crop_0"], 1000)
+    tmin, tmax = weather["tmin"].to_numpy(), weather["tmax"].to_numpy()
+
+    def reference():
+        return {
+            crop_id: pd.Series(
+                [compute_daily_gdd(lo, hi, params["t_base"], params["t_upper"]) for lo, hi in zip(tmin, tmax)]
+            ).cumsum()
+            for crop_id, params in crops_table.items()
+        }
+
+    def fast():
+        return project.compute_multi_crop_gdd(weather, crops_table=crops_table)
+
+    expected = reference()
+    cumulative = fast()
+    assert list(cumulative.columns) == list(crops_table)
+    for crop_id in crops_table:
+        assert list(cumulative[crop_id]) == pytest.approx(list(expected[crop_id]), nan_ok=True)
+    assert_not_slower("compute_multi_crop_gdd", fast, reference)
+
+
+@pytest.mark.parametrize("seed", HARNESS_SEEDS)
+@pytest.mark.parametrize("mode", project.SCENARIO_MODES)
+def test_harness_run_temperature_scenarios(seed, mode):
+    rng = np.random.default_rng(seed)
+    params = random_crop(rng)
+    # Drop the trailing missing day so the final stage is not always post_harvest.
+    weather = random_weather(rng, params, 500).iloc[:-1]
+    tmin, tmax = weather["tmin"].to_numpy(), weather["tmax"].to_numpy()
+    if mode == "offset":
+        deltas = rng.integers(-8, 9, size=8) / 2.0
+    else:
+        deltas = rng.integers(16, 25, size=8) / 20.0
+
+    # Scalar reference: shift the weather, accumulate day by day, classify the last day.
+    def reference():
+        results = []
+        for delta in deltas:
+            shift = (lambda t: t + delta) if mode == "offset" else (lambda t: t * delta)
+            daily = [compute_daily_gdd(shift(lo), shift(hi), params["t_base"], params["t_upper"])
+                     for lo, hi in zip(tmin, tmax)]
+            cumulative = pd.Series(daily).cumsum()
+            stage, progress = determine_growing_stage(cumulative.iloc[-1], params["stages"])
+            results.append((cumulative, stage, progress))
+        return results
+
+    def fast():
+        return project.run_temperature_scenarios(weather, params, deltas, mode)
+
+    expected = reference()
+    table, cumulative = fast()
+    for i, (expected_cumulative, stage, progress) in enumerate(expected):
+        assert list(cumulative[i]) == pytest.approx(list(expected_cumulative), nan_ok=True)
+        assert table["stage"].iloc[i] == stage
+        assert table["stage_progress"].iloc[i] == pytest.approx(progress)
+    assert_not_slower("run_temperature_scenarios", fast, reference)
+
+
+@pytest.mark.parametrize("seed", HARNESS_SEEDS)
+def test_harness_integrate_daily_gdd_hourly(seed):
+    rng = np.random.default_rng(seed)
+    params = random_crop(rng)
+    t_base, t_upper = params["t_base"], params["t_upper"]
+    # Hourly values on a 0.5 °C grid hitting both thresholds, with missing
+    # hours and one day without any hourly value.
+    hourly = rng.integers(-20, 90, size=(400, 24)) / 2.0
+    hourly[0, :2] = t_base, t_upper
+    hourly[rng.random(hourly.shape) < 0.03] = np.nan
+    hourly[2] = np.nan
+    days = np.datetime64("2000-01-01") + np.arange(len(hourly))
+
+    def reference():
+        results = []
+        for day in hourly:
+            values = [compute_daily_gdd(t, t, t_base, t_upper) for t in day if not np.isnan(t)]
+            results.append(sum(values) / len(values) if values else np.nan)
+        return results
+
+    def fast():
+        return project.integrate_daily_gdd(hourly, t_base, t_upper)
+
+    assert list(fast()) == pytest.approx(reference(), nan_ok=True)
+    assert_not_slower("integrate_daily_gdd_hourly", fast, reference)
+
+    # The compact streamed frame keeps every hourly value of the days with data.
+    weather = project.aggregate_hourly_temp(days, hourly)
+    kept = ~np.isnan(hourly).all(axis=1)
+    assert np.array_equal(project.daily_temperatures(weather), hourly[kept], equal_nan=True)
+
+
+@pytest.mark.parametrize("seed", HARNESS_SEEDS)
+def test_harness_cumulative_gdd_candidates(seed):
+    rng = np.random.default_rng(seed)
+    candidates = [random_crop(rng) for _ in range(8)]
+    t_base = [c["t_base"] for c in candidates]
+    t_upper = [c["t_upper"] for c in candidates]
+    # Seasons of different lengths, so shorter ones are padded.
+    seasons = [
+        {"weather": random_weather(rng, candidates[s], int(rng.integers(150, 300))),
+         "planting_date": dt.date(2000, 1, 1), "events": {}}
+        for s in range(4)
+    ]
+    temperatures, lengths, _ = calibration.stack_observed_seasons(seasons)
+
+    def reference():
+        return [
+            [pd.Series([compute_daily_gdd(lo, hi, b, u) for lo, hi in zip(w["tmin"], w["tmax"])]).cumsum()
+             for w in (season["weather"] for season in seasons)]
+            for b, u in zip(t_base, t_upper)
+        ]
+
+    def fast():
+        return calibration.cumulative_gdd_candidates(temperatures, t_base, t_upper)
+
+    expected = reference()
+    cumulative = fast()
+    assert cumulative.shape == (len(candidates), len(seasons), lengths.max())
+    for c in range(len(candidates)):
+        for s, length in enumerate(lengths):
+            assert list(cumulative[c, s, :length]) == pytest.approx(list(expected[c][s]), nan_ok=True)
+            assert np.isnan(cumulative[c, s, length:]).all()
+    assert_not_slower("cumulative_gdd_candidates", fast, reference)
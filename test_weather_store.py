@@ -0,0 +1,77 @@
+import pytest
+import zipfile
+import numpy as np
+import pandas as pd
+from weather_store import WeatherStore, chunk_name
+
+
+# Build a weather frame with temperatures that encode the day number.
+def build_weather(start, periods):
+    dates = pd.date_range(start, periods=periods, freq="D")
+    tmin = np.arange(periods, dtype=float)
+    return pd.DataFrame({"date": dates, "tmin": tmin, "tmax": tmin + 10.0})
+
+
+def test_write_and_read_range(tmp_path):
+    store = WeatherStore(tmp_path / "region.zip")
+    cell = (16.5, 120.6)
+
+    # A series across a year boundary is split into one chunk per year.
+    weather = build_weather("2023-12-20", 30)
+    store.write(cell, weather)
+    assert store.cells() == [cell]
+    assert store.years(cell) == [2023, 2024]
+
+    # Range reads return exactly the stored days inside the range.
+    result = store.read_range(cell, "2023-12-30", "2024-01-02")
+    assert list(result["date"].dt.strftime("%Y-%m-%d")) == [
+        "2023-12-30", "2023-12-31", "2024-01-01", "2024-01-02",
+    ]
+    assert list(result["tmin"]) == [10.0, 11.0, 12.0, 13.0]
+    assert list(result["quality_flag"]) == [0, 0, 0, 0]
+
+    # Unknown cells and ranges outside the stored years are empty.
+    assert store.read_range((0.0, 0.0), "2024-01-01", "2024-01-02").empty
+    assert store.read_range(cell, "2020-01-01", "2020-12-31").empty
+
+    # Data stored with one gap fill method is not served for another.
+    assert store.read_range(cell, "2023-12-30", "2024-01-02", fill_method=None).empty
+    store.write(cell, build_weather("2024-01-01", 3), fill_method=None)
+    assert store.cells() == [cell]
+    assert store.years(cell, fill_method=None) == [2024]
+    assert len(store.read_range(cell, "2024-01-01", "2024-01-31", fill_method=None)) == 3
+    assert len(store.read_range(cell, "2024-01-01", "2024-01-31")) == 18
+
+
+def test_update_existing_chunks(tmp_path):
+    path = tmp_path / "region.zip"
+    store = WeatherStore(path)
+    store.write((16.5, 120.6), build_weather("2024-01-01", 10))
+    store.write((-12.0, -45.0), build_weather("2024-01-01", 5))
+
+    # Extending a stored year appends a new version of only that chunk.
+    store.write((16.5, 120.6), build_weather("2024-01-11", 10))
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+    assert sorted(names) == sorted([
+        chunk_name((16.5, 120.6), 2024),
+        chunk_name((-12.0, -45.0), 2024),
+        chunk_name((16.5, 120.6), 2024, version=1),
+    ])
+    assert len(store.read_range((16.5, 120.6), "2024-01-01", "2024-12-31")) == 20
+
+    # A reopened store rebuilds its index from the archive.
+    reopened = WeatherStore(path)
+    assert reopened.cells() == [(-12.0, -45.0), (16.5, 120.6)]
+    assert len(reopened.read_range((16.5, 120.6), "2024-01-01", "2024-12-31")) == 20
+    assert len(reopened.read_range((-12.0, -45.0), "2024-01-01", "2024-12-31")) == 5
+
+    # Compaction keeps only the latest version of every chunk.
+    reopened.compact()
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+    assert sorted(names) == sorted(
+        [chunk_name((16.5, 120.6), 2024), chunk_name((-12.0, -45.0), 2024)]
+    )
+    assert len(reopened.read_range((16.5, 120.6), "2024-01-01", "2024-12-31")) == 20
+    reopened.close()
@@ -0,0 +1,214 @@
+# Local regional weather store.
+#
+# Daily tmin/tmax for many grid cells are kept in one compressed archive
+# (a zip file with DEFLATE compression). Every (cell, year) pair is stored as
+# its own chunk: a (3 x 366) float64 array of tmin, tmax and quality_flag
+# indexed by day of year, with NaN for days that are not stored. The archive
+# member names form the (cell, date) index, so a range read only decompresses
+# the year chunks it touches.
+#
+# The archive is append-only: updating a chunk appends a new version of it
+# and reads resolve to the latest version, so an update costs only the
+# chunks it touches. compact() drops superseded versions.
+#
+# Cells are (latitude, longitude) pairs and are used as given; callers are
+# expected to snap coordinates to the provider grid first. Chunks are kept
+# apart per gap fill method (see project.clean_daily_temp), so data repaired
+# one way is never served to a caller asking for another.
+
+import datetime as dt
+import io
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+
+# Number of day-of-year slots per yearly chunk (leap years use all of them)
+DAYS_PER_CHUNK = 366
+
+# Rows of a chunk array
+CHUNK_ROWS = ["tmin", "tmax", "quality_flag"]
+
+
+# Archive directory name of a gap fill method (None means gaps were not filled)
+def fill_tag(fill_method):
+    return "none" if fill_method is None else fill_method
+
+
+# Archive member name of one version of the chunk holding a year of a cell
+def chunk_name(cell, year, version=0, fill_method="interpolate"):
+    return f"{cell[0]:.6f}_{cell[1]:.6f}/{fill_tag(fill_method)}/{year}.{version}.npy"
+
+
+# Parse an archive member name back into (cell, fill_method, year, version)
+def parse_chunk_name(name):
+    cell_part, tag, chunk_part = name.split("/")
+    lat, lon = cell_part.split("_")
+    year, version, _ = chunk_part.split(".")
+    fill_method = None if tag == "none" else tag
+    return (float(lat), float(lon)), fill_method, int(year), int(version)
+
+
+class WeatherStore:
+    # Open (or prepare to create) a store at path
+    def __init__(self, path):
+        self.path = path
+        self._index = {}
+        self._reader = None
+
+        if os.path.exists(path):
+            self._index_members(self._zip().namelist())
+
+    # Record the latest version of every chunk in the index, keyed by
+    # (cell, fill_method)
+    def _index_members(self, names):
+        for name in names:
+            cell, fill_method, year, version = parse_chunk_name(name)
+            stored_years = self._index.setdefault((cell, fill_method), {})
+            if year not in stored_years or version > stored_years[year][0]:
+                stored_years[year] = (version, name)
+
+    # Archive opened for reading, kept open between reads
+    def _zip(self):
+        if self._reader is None:
+            self._reader = zipfile.ZipFile(self.path)
+        return self._reader
+
+    # Close the cached reader (it is reopened on the next read)
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # Cells that have at least one stored chunk
+    def cells(self):
+        return sorted({cell for cell, _ in self._index})
+
+    # Years stored for a cell with the given gap fill method
+    def years(self, cell, fill_method="interpolate"):
+        return sorted(self._index.get((tuple(cell), fill_method), {}))
+
+    # Read the stored days of a cell between start_date and end_date
+    # (inclusive) that were filled with fill_method; only the yearly chunks in
+    # the range are decompressed
+    def read_range(self, cell, start_date, end_date, fill_method="interpolate"):
+        start = dt.date.fromisoformat(str(start_date))
+        end = dt.date.fromisoformat(str(end_date))
+        stored_years = self._index.get((tuple(cell), fill_method), {})
+
+        frames = [
+            _chunk_to_frame(_read_chunk(self._zip(), stored_years[year][1]), year)
+            for year in range(start.year, end.year + 1)
+            if year in stored_years
+        ]
+        if not frames:
+            return _chunk_to_frame(np.full((len(CHUNK_ROWS), 0), np.nan), start.year)
+
+        weather = pd.concat(frames, ignore_index=True)
+        days = weather["date"].dt.date
+        return weather[(days >= start) & (days <= end)].reset_index(drop=True)
+
+    # Store the weather of one cell (date, tmin, tmax and optional quality_flag)
+    # whose gaps were filled with fill_method
+    def write(self, cell, weather, fill_method="interpolate"):
+        self.write_many({tuple(cell): weather}, fill_method)
+
+    # Store the weather of many cells in a single archive update. Each touched
+    # chunk is merged with its latest version and appended as a new version.
+    def write_many(self, weather_by_cell, fill_method="interpolate"):
+        updates = {}
+        for cell, weather in weather_by_cell.items():
+            cell = tuple(cell)
+            weather = weather.dropna(subset=["tmin", "tmax"])
+            if weather.empty:
+                continue
+
+            dates = weather["date"].dt
+            flags = (
+                weather["quality_flag"].to_numpy(dtype=float)
+                if "quality_flag" in weather.columns
+                else np.zeros(len(weather))
+            )
+            values = np.vstack([
+                weather["tmin"].to_numpy(dtype=float),
+                weather["tmax"].to_numpy(dtype=float),
+                flags,
+            ])
+            year_of_row = dates.year.to_numpy()
+            slot_of_row = dates.dayofyear.to_numpy() - 1
+
+            for year in np.unique(year_of_row):
+                year = int(year)
+                if (cell, year) not in updates:
+                    latest = self._index.get((cell, fill_method), {}).get(year)
+                    if latest is None:
+                        chunk = np.full((len(CHUNK_ROWS), DAYS_PER_CHUNK), np.nan)
+                        version = 0
+                    else:
+                        chunk = _read_chunk(self._zip(), latest[1])
+                        version = latest[0] + 1
+                    name = chunk_name(cell, year, version, fill_method)
+                    updates[(cell, year)] = (name, chunk)
+                rows = year_of_row == year
+                updates[(cell, year)][1][:, slot_of_row[rows]] = values[:, rows]
+
+        if not updates:
+            return
+
+        self.close()
+        with zipfile.ZipFile(self.path, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, chunk in updates.values():
+                _write_chunk(zf, name, chunk)
+        self._index_members(name for name, _ in updates.values())
+
+    # Rewrite the archive with only the latest version of every chunk
+    def compact(self):
+        if not os.path.exists(self.path):
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        src = self._zip()
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as dst:
+            for (cell, fill_method), years in self._index.items():
+                for year, (_, name) in years.items():
+                    dst.writestr(chunk_name(cell, year, 0, fill_method), src.read(name))
+        self.close()
+        os.replace(tmp_path, self.path)
+
+        self._index = {}
+        with zipfile.ZipFile(self.path) as zf:
+            self._index_members(zf.namelist())
+
+
+# Decompress one chunk array from the archive
+def _read_chunk(zf, name):
+    return np.load(io.BytesIO(zf.read(name)))
+
+
+# Compress one chunk array into the archive
+def _write_chunk(zf, name, chunk):
+    buffer = io.BytesIO()
+    np.save(buffer, chunk)
+    zf.writestr(name, buffer.getvalue())
+
+
+# Convert a yearly chunk array into a weather frame of its stored days
+def _chunk_to_frame(chunk, year):
+    n_slots = chunk.shape[1]
+    dates = np.datetime64(f"{year}-01-01") + np.arange(n_slots).astype("timedelta64[D]")
+    stored = ~np.isnan(chunk[0]) & ~np.isnan(chunk[1])
+    stored &= dates.astype("datetime64[Y]").astype(int) + 1970 == year
+
+    return pd.DataFrame({
+        "date": pd.to_datetime(dates[stored]),
+        "tmin": chunk[0][stored],
+        "tmax": chunk[1][stored],
+        "quality_flag": chunk[2][stored].astype(int),
+    })